@@ -0,0 +1,84 @@
+# Cost of the game-clustered bootstrap confidence intervals behind the team scatter and season combo charts:
+#   - batched:  kickoff.bootstrap.cluster_bootstrap (counts of drawn games per replicate, one batched matrix
+#               product per batch of replicates)
+#   - loop:     the textbook version, one replicate at a time in Python (timed on fewer replicates and scaled up)
+#
+# Per-game totals are synthetic: 32 teams x 17 games (the team chart, one season) and 5 or 26 seasons x 272
+# games (the season chart). The batched intervals are checked against the loop's, which only agree up to
+# Monte Carlo noise since the draws differ. The team grain should stay well under --budget ms
+#
+# Usage: python benchmarks/bench_bootstrap.py [--replicates 2000] [--repeat 20] [--budget 200]
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.common import timed  # noqa: E402
+from kickoff.aggregates import INTERVAL_MEASURES  # noqa: E402
+from kickoff.bootstrap import LEVEL, cluster_bootstrap  # noqa: E402
+
+# Groups x games per group of each case
+CASES = [('team (32 x 17)', 32, 17), ('season (5 x 272)', 5, 272), ('season (26 x 272)', 26, 272)]
+
+
+# Per-game numerator and denominator totals shaped like the kickoff measures: ~8 kickoffs a game, about half
+# of them returned, a third of the drives scoring and starting around the 30
+def game_totals(groups, games, seed=1):
+    rng = np.random.default_rng(seed)
+    kickoffs = rng.poisson(8, (groups * games, 1)).astype(float) + 1
+    returns = rng.binomial(kickoffs.astype(int), 0.5).astype(float)
+    numerators = np.concatenate([rng.binomial(kickoffs.astype(int), 0.35), returns,
+                                 kickoffs * rng.normal(30, 3, kickoffs.shape), returns * rng.normal(29, 4, kickoffs.shape)], axis=1)
+    denominators = np.concatenate([kickoffs, kickoffs, kickoffs, returns], axis=1)
+    return np.repeat(np.arange(groups), games), numerators, denominators
+
+
+# One replicate at a time: draw each group's games, sum and divide
+def loop_bootstrap(groups, numerators, denominators, replicates, level=LEVEL, seed=0):
+    rng = np.random.default_rng(seed)
+    low, high = [], []
+    for group in np.unique(groups):
+        rows = np.flatnonzero(groups == group)
+        ratios = []
+        for _ in range(replicates):
+            drawn = rows[rng.integers(0, len(rows), len(rows))]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratios.append(numerators[drawn].sum(axis=0) / denominators[drawn].sum(axis=0))
+        low.append(np.nanquantile(ratios, (1 - level) / 2, axis=0))
+        high.append(np.nanquantile(ratios, 1 - (1 - level) / 2, axis=0))
+    return np.array(low), np.array(high)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replicates', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=200)
+    args = parser.parse_args()
+
+    print(f'{len(INTERVAL_MEASURES)} measures, {args.replicates} replicates, {os.cpu_count()} CPUs; times in ms')
+    print(f'{"case":<20} {"batched median":>15} {"p90":>8} {"loop (est.)":>12} {"max CI diff":>12}')
+    for label, groups, games in CASES:
+        totals = game_totals(groups, games)
+        cluster_bootstrap(*totals, args.replicates)
+        median, p90 = timed(lambda i: cluster_bootstrap(*totals, args.replicates), args.repeat)
+
+        # The loop is slow: time a tenth of the replicates once, and compare intervals at the full count for the
+        # team case only
+        sample = max(1, args.replicates // 10)
+        loop_ms = timed(lambda i: loop_bootstrap(*totals, sample), 1)[0] * args.replicates / sample
+        difference = ''
+        if groups * games <= 1000:
+            low, high = cluster_bootstrap(*totals, args.replicates)
+            loop_low, loop_high = loop_bootstrap(*totals, args.replicates)
+            width = high - low
+            difference = f'{np.nanmax(np.abs([low - loop_low, high - loop_high]) / width):.0%} of CI'
+        budget = ' (over budget)' if label.startswith('team') and median > args.budget else ''
+        print(f'{label:<20} {median:15.1f} {p90:8.1f} {loop_ms:12.0f} {difference:>12}{budget}')
+
+
+if __name__ == '__main__':
+    main()
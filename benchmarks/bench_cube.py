@@ -0,0 +1,58 @@
+# Per-rerun cost of the dashboard summaries as the history grows: the SQL engine filtering the kickoff
+# fact table against the pre-aggregated cube adding up cells. Before timing, both engines must return
+# identical summaries over a grid of filter pane states (tests/test_cube.py checks the same on small data).
+#
+# Usage: python benchmarks/bench_cube.py [--seasons 5,10,25] [--games 272] [--repeat 50]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.common import FILTER_GRID, FILTER_STATES, assert_same_summaries, recent_years, synthetic_facts, timed  # noqa: E402
+from kickoff import synthetic  # noqa: E402
+from kickoff.cube import KickoffCube  # noqa: E402
+from kickoff.queries import KickoffQueries, filter_params  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', default='5,10,25', help='comma separated season counts')
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    # Synthetic seasons are generated in memory (no filler columns: only the retained columns reach the facts)
+    most = max(int(count) for count in args.seasons.split(','))
+    years = recent_years(most)
+    frames = {year: synthetic.season_frame(year, games=args.games, filler_columns=False) for year in years}
+
+    for count in [int(count) for count in args.seasons.split(',')]:
+        season_years = years[-count:]
+        df_game_log = pd.concat([frames[year] for year in season_years], ignore_index=True)
+        kickoff_facts = synthetic_facts(df_game_log, season_years)
+
+        start = time.perf_counter()
+        kickoff_queries = KickoffQueries(kickoff_facts)
+        sql_build = time.perf_counter() - start
+        start = time.perf_counter()
+        kickoff_cube = KickoffCube.from_facts(kickoff_facts)
+        cube_build = time.perf_counter() - start
+
+        for state in FILTER_GRID:
+            filters = filter_params(*state)
+            assert_same_summaries(kickoff_queries.summaries(filters), kickoff_cube.summaries(filters))
+
+        cells = len(kickoff_cube.season_cells.kickoffs) + sum(len(team_cells.kickoffs) for team_cells in kickoff_cube.team_cells.values())
+        print(f'{count} seasons: {len(kickoff_facts)} kickoffs, {cells} cells, {len(FILTER_GRID)} filter states identical')
+        print(f'  build    sql {sql_build:6.2f} s   cube {cube_build:6.2f} s')
+        for name, engine in [('sql', kickoff_queries), ('cube', kickoff_cube)]:
+            median, p90 = timed(lambda i: engine.summaries(filter_params(*FILTER_STATES[i % len(FILTER_STATES)])), args.repeat)
+            print(f'  {name:<6} median {median:7.2f} ms   p90 {p90:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# Summary latency and memory of the SQL engine over the whole play-by-play history (synthetic seasons 1999-2024):
+#   - memory:  the fact table loaded into pandas and copied into an in-memory DuckDB table (what the dashboard
+#              did before the dataset)
+#   - dataset: the season-partitioned Parquet dataset queried in place, under the memory limit
+#
+# Each engine runs in a fresh process, which reports the resident memory added by loading it (and the peak
+# while loading and querying), then the median and p90 latency of the summaries over a few filter states for
+# several season ranges. Raise --games to see how both grow with the size of the history
+#
+# Usage: python benchmarks/bench_history.py [--first 1999] [--last 2024] [--games 272] [--repeat 20] [--memory-limit 256MB]
+import argparse
+import gc
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import FILTER_STATES  # noqa: E402
+from kickoff import instrument  # noqa: E402
+
+
+def run_child(engine, dataset, last, repeat, memory_limit):
+    import duckdb
+    from kickoff.dataset import scan_sql
+    from kickoff.queries import KickoffQueries, filter_params
+
+    gc.collect()
+    instrument.reset_peak()
+    before = instrument.memory_kb('VmRSS:')
+    if engine == 'memory':
+        kickoff_facts = duckdb.connect().execute(f'select * from {scan_sql(dataset)}').df()
+        kickoff_queries = KickoffQueries(kickoff_facts)
+        del kickoff_facts
+    else:
+        kickoff_queries = KickoffQueries(dataset, memory_limit=memory_limit)
+    gc.collect()
+    result = {'load_mb': (instrument.memory_kb('VmRSS:') - before) / 1024, 'ranges': {}}
+
+    for label, seasons in [('1 season', (last, last)), ('5 seasons', (last - 4, last)), ('all seasons', (0, last))]:
+        kickoff_queries.summaries(filter_params(*FILTER_STATES[0], seasons=seasons))
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            kickoff_queries.summaries(filter_params(*FILTER_STATES[i % len(FILTER_STATES)], seasons=seasons))
+            times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+        result['ranges'][label] = (times[len(times) // 2], times[int(len(times) * 0.9)])
+    result['peak_mb'] = (instrument.memory_kb('VmHWM:') - before) / 1024
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--first', type=int, default=1999)
+    parser.add_argument('--last', type=int, default=2024)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--memory-limit', default='256MB')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--dataset', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.dataset, args.last, args.repeat, args.memory_limit)
+        return
+
+    from kickoff import synthetic
+    from kickoff.dataset import partition_path, write_dataset
+    from kickoff.facts import build_kickoff_facts
+    from kickoff.reference import slim_rosters, slim_teams
+
+    years = list(range(args.first, args.last + 1))
+    work = tempfile.mkdtemp(prefix='kickoff_history_')
+    dataset = os.path.join(work, 'kickoff_facts')
+    try:
+        # One season at a time, so the generator never holds the whole history either
+        kickers, team_names = slim_rosters(synthetic.rosters(years)), slim_teams(synthetic.teams())
+        kickoffs = 0
+        for year in years:
+            kickoff_facts = build_kickoff_facts(synthetic.season_frame(year, games=args.games, filler_columns=False), kickers, team_names)
+            write_dataset(kickoff_facts, dataset)
+            kickoffs += len(kickoff_facts)
+        size_mb = sum(os.path.getsize(partition_path(dataset, year)) for year in years) / 1024 / 1024
+
+        print(f'{len(years)} seasons x {args.games} games: {kickoffs} kickoffs, dataset {size_mb:.1f} MB on disk, '
+              f'memory limit {args.memory_limit}')
+        print(f'{"engine":<8} {"load MB":>8} {"peak MB":>8}   summaries median / p90 ms by season range')
+        for engine in ['memory', 'dataset']:
+            output = subprocess.run([sys.executable, __file__, '--child', engine, '--dataset', dataset, '--last', str(args.last),
+                                     '--repeat', str(args.repeat), '--memory-limit', args.memory_limit],
+                                    cwd=ROOT, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            ranges = '   '.join(f'{label} {median:6.1f} / {p90:6.1f}' for label, (median, p90) in result['ranges'].items())
+            print(f"{engine:<8} {result['load_mb']:8.1f} {result['peak_mb']:8.1f}   {ranges}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
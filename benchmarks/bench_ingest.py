@@ -0,0 +1,85 @@
+# Peak memory and time of the streaming ingest (kickoff.ingest.parse_season) against the original
+# path that read every column of every play before filtering to kickoffs.
+#
+# Usage: python benchmarks/bench_ingest.py [--seasons 5] [--games 272] [--data-dir DIR]
+#
+# Each path runs in a fresh process so the peak resident set size belongs to that path alone
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import fixture_dir, recent_years  # noqa: E402
+from kickoff.ingest import RETAINED_COLUMNS, parse_season  # noqa: E402
+from kickoff.sources import PBP_FILE_NAME  # noqa: E402
+
+
+# The load_game_logs loop as it was before streaming ingest
+def legacy_parse_season(path):
+    import pandas as pd
+    df_game_log_year = pd.read_csv(path, compression='gzip', low_memory=False)
+    df_game_log_year = df_game_log_year[df_game_log_year['play_type'] == 'kickoff']
+    return df_game_log_year[RETAINED_COLUMNS]
+
+
+# Peak resident set size of this process in KB. /proc's VmHWM is preferred on Linux because ru_maxrss
+# can carry over the high-water mark of the parent that forked this process
+def peak_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_child(method, data_dir, years):
+    import pandas as pd
+    parse = legacy_parse_season if method == 'legacy' else parse_season
+    baseline_kb = peak_rss_kb()
+    start = time.perf_counter()
+    df = pd.concat([parse(os.path.join(data_dir, PBP_FILE_NAME.format(year=year))) for year in years])
+    seconds = time.perf_counter() - start
+    peak_kb = peak_rss_kb()
+    print(json.dumps({'method': method, 'rows': len(df), 'seconds': round(seconds, 3),
+                      'peak_rss_mb': round(peak_kb / 1024, 1), 'peak_growth_mb': round((peak_kb - baseline_kb) / 1024, 1),
+                      'result_mb': round(df.memory_usage(deep=True).sum() / 2**20, 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--data-dir', help='directory of play_by_play_{year}.csv.gz files (synthetic files are generated when empty)')
+    parser.add_argument('--child', choices=['legacy', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    years = recent_years(args.seasons)
+
+    if args.child:
+        run_child(args.child, args.data_dir, years)
+        return
+
+    data_dir = fixture_dir(years, args.games, data_dir=args.data_dir)
+
+    results = []
+    for method in ['legacy', 'streaming']:
+        out = subprocess.run([sys.executable, __file__, '--child', method, '--seasons', str(args.seasons),
+                              '--games', str(args.games), '--data-dir', data_dir], check=True, capture_output=True, text=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'method':<10} {'rows':>8} {'seconds':>8} {'peak RSS MB':>12} {'growth MB':>10} {'result MB':>10}")
+    for r in results:
+        print(f"{r['method']:<10} {r['rows']:>8} {r['seconds']:>8} {r['peak_rss_mb']:>12} {r['peak_growth_mb']:>10} {r['result_mb']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Wall-clock time of a cold load_game_logs refresh (empty season cache) with seasons loaded one after
+# another versus concurrently (thread pool for fetching, DuckDB's multithreaded reader for parsing).
+# Runs fully offline against a local directory of synthetic play_by_play_{year}.csv.gz files.
+#
+# Usage: python benchmarks/bench_load.py [--seasons 5] [--games 272] [--fetch-workers 8] [--parse-workers N]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.common import fixture_dir, recent_years  # noqa: E402
+from kickoff.schema import concat_seasons  # noqa: E402
+from kickoff.season_cache import SeasonCache  # noqa: E402
+from kickoff.sources import LocalSource  # noqa: E402
+
+
+def cold_load(data_dir, years, fetch_workers, parse_workers):
+    cache_dir = tempfile.mkdtemp(prefix='kickoff_bench_cache_')
+    try:
+        cache = SeasonCache(cache_dir, LocalSource(data_dir), current_season=max(years))
+        start = time.perf_counter()
+        df = concat_seasons(cache.load_many(years, fetch_workers=fetch_workers, parse_workers=parse_workers))
+        return time.perf_counter() - start, df
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--fetch-workers', type=int, default=8)
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--data-dir', help='directory of play_by_play_{year}.csv.gz files (synthetic files are generated when empty)')
+    args = parser.parse_args()
+
+    years = recent_years(args.seasons)
+    data_dir = fixture_dir(years, args.games, data_dir=args.data_dir)
+
+    sequential_seconds, sequential = cold_load(data_dir, years, 1, 1)
+    parallel_seconds, parallel = cold_load(data_dir, years, args.fetch_workers, args.parse_workers)
+
+    # Same rows in the same season order either way
+    pd.testing.assert_frame_equal(sequential.reset_index(drop=True), parallel.reset_index(drop=True))
+    assert list(parallel['season'].drop_duplicates()) == years
+
+    print(f'cpu count: {os.cpu_count()}, seasons: {len(years)}, kickoffs: {len(parallel)}')
+    print(f'sequential:                                   {sequential_seconds:.2f}s')
+    print(f'parallel ({args.fetch_workers} fetch / {args.parse_workers} parse workers): {parallel_seconds:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
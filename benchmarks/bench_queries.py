@@ -0,0 +1,90 @@
+# Per-rerun query cost of the dashboard summaries:
+#   - the previous path: filter the fact table in pandas, then one module-level duckdb.sql call per summary
+#     scanning the filtered DataFrame, with the hand-written queries of before (BASELINE_SQL in benchmarks/common.py)
+#   - the query layer running one parameterized query per summary on its long-lived connection
+#   - the query layer's single GROUPING SETS pass computing all three summaries at once
+#
+# Usage: python benchmarks/bench_queries.py [--seasons 5] [--games 272] [--repeat 50]
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import duckdb  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.common import (BASELINE_SQL, FILTER_STATES, assert_same_summaries, fixture_dir, recent_years,  # noqa: E402
+                               synthetic_facts, timed)
+from kickoff.aggregates import GRAINS, split_summaries, summary_sql  # noqa: E402
+from kickoff.queries import KickoffQueries, filter_params  # noqa: E402
+
+# One generated query per summary
+GRAIN_SQL = {grain: summary_sql((grain,)) for grain in GRAINS}
+
+
+# The summary queries as they ran before: duckdb.sql over a pandas DataFrame named "kickoffs"
+def legacy_summaries(kickoff_facts, minutes_remaining_game, minutes_remaining_half, roof_type, return_type):
+    keep = (kickoff_facts['game_seconds_remaining'] / 60.0).between(*minutes_remaining_game)
+    keep &= (kickoff_facts['half_seconds_remaining'] / 60.0).between(*minutes_remaining_half)
+    if roof_type != 'Select All':
+        keep &= kickoff_facts['roof'] == roof_type
+    if return_type == 'Touchback':
+        keep &= kickoff_facts['kickoff_returner_player_id'].isna()
+    elif return_type == 'Return':
+        keep &= kickoff_facts['kickoff_returner_player_id'].notna()
+    duckdb.register('kickoffs', kickoff_facts[keep])
+
+    summaries = {}
+    for grain, sql in BASELINE_SQL.items():
+        summaries[grain] = duckdb.sql(sql).df()
+    duckdb.unregister('kickoffs')
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--data-dir', help='directory of play_by_play_{year}.csv.gz files (synthetic files are generated when empty)')
+    args = parser.parse_args()
+
+    years = recent_years(args.seasons)
+    data_dir = fixture_dir(years, args.games, data_dir=args.data_dir)
+
+    from kickoff.ingest import parse_season
+    from kickoff.sources import LocalSource
+    source = LocalSource(data_dir)
+    df_game_log = pd.concat([parse_season(source.path(year)) for year in years])
+    kickoff_facts = synthetic_facts(df_game_log, years)
+    kickoff_queries = KickoffQueries(kickoff_facts)
+
+    def before(i):
+        return legacy_summaries(kickoff_facts, *FILTER_STATES[i % len(FILTER_STATES)])
+
+    def per_grain(i):
+        filters = filter_params(*FILTER_STATES[i % len(FILTER_STATES)])
+        summaries = {}
+        for grain, sql in GRAIN_SQL.items():
+            summaries.update(split_summaries(kickoff_queries.run(sql, filters), (grain,)))
+        return summaries
+
+    def single_pass(i):
+        return kickoff_queries.summaries(filter_params(*FILTER_STATES[i % len(FILTER_STATES)]))
+
+    # Every path must return the summaries of the previous queries
+    for i in range(len(FILTER_STATES)):
+        expected = before(i)
+        for summaries in (per_grain(i), single_pass(i)):
+            assert_same_summaries(expected, summaries)
+
+    print(f'{len(kickoff_facts)} kickoffs, season/team/penalty summaries per rerun, {args.repeat} reruns')
+    for name, function in [('duckdb.sql over a DataFrame', before), ('one query per summary', per_grain),
+                           ('single GROUPING SETS pass', single_pass)]:
+        median, p90 = timed(function, args.repeat)
+        print(f'{name:<30} median {median:7.2f} ms   p90 {p90:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Memory and cache-copy cost of the cached kickoff frame (load_game_logs) under three column layouts:
+#   - object: Python string objects and float64, as the frame was held before streaming ingest
+#   - arrow:  Arrow-backed strings and float64, as the streaming ingest produced before the compact schema
+#   - schema: the compact schema of kickoff/schema.py (categoricals, Int8 flags, Int16/float32 numerics)
+#
+# st.cache_data pickles the frame when it is stored and unpickles a fresh copy on every access, so the
+# copy time below is what each rerun pays to get the frame out of the cache.
+#
+# Usage: python benchmarks/bench_schema.py [--seasons 5] [--games 272] [--repeat 20] [--data-dir DIR]
+import argparse
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.common import fixture_dir, recent_years, timed  # noqa: E402
+from kickoff.ingest import parse_season  # noqa: E402
+from kickoff.schema import CATEGORY, KICKOFF_SCHEMA, TEXT, concat_seasons  # noqa: E402
+from kickoff.sources import LocalSource  # noqa: E402
+
+STRING_COLUMNS = [column for column, dtype in KICKOFF_SCHEMA.items() if dtype in (CATEGORY, TEXT)]
+
+
+# The same rows with every string column as `string_dtype` and every numeric column as float64 (season int64)
+def wide_layout(df, string_dtype):
+    types = {column: string_dtype if column in STRING_COLUMNS else 'float64' for column in df.columns}
+    types['season'] = 'int64'
+    return df.astype(types)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--data-dir', help='directory of play_by_play_{year}.csv.gz files (synthetic files are generated when empty)')
+    args = parser.parse_args()
+
+    years = recent_years(args.seasons)
+    data_dir = fixture_dir(years, args.games, data_dir=args.data_dir)
+
+    source = LocalSource(data_dir)
+    compact = concat_seasons([parse_season(source.path(year)) for year in years])
+    layouts = {'object': wide_layout(compact, object), 'arrow': wide_layout(compact, 'str'), 'schema': compact}
+
+    # Every layout holds the same values
+    for name, df in layouts.items():
+        pd.testing.assert_frame_equal(wide_layout(df, object), layouts['object'])
+
+    print(f'{len(compact)} kickoffs x {len(compact.columns)} columns, {args.repeat} cache round trips')
+    print(f'{"layout":<8} {"memory MB":>10} {"pickled MB":>11} {"store ms":>9} {"copy out ms":>12}')
+    for name, df in layouts.items():
+        memory = df.memory_usage(deep=True).sum() / 2**20
+        stored = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+        store = timed(lambda i: pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL), args.repeat)[0]
+        copy_out = timed(lambda i: pickle.loads(stored), args.repeat)[0]
+        print(f'{name:<8} {memory:10.1f} {len(stored) / 2**20:11.1f} {store:9.1f} {copy_out:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Rerun cost of the dashboard's chart sections after a filter change:
+#   - sequential: one summaries() query for all grains, then the intervals, then each figure in turn
+#   - sections:   the section runner with nothing kept, so everything is computed: the summaries and intervals
+#                 queries on its thread pool, then the figures built one after another on the calling thread
+#   - revisit:    the section runner going back to filter states it has already computed
+#
+# The sections column is timed with 1 worker (the two queries one after the other) and with the given worker
+# counts. Only the queries overlap: DuckDB releases the GIL while a query runs, figure building mostly does not,
+# so the figures are not built on the pool
+#
+# Usage: python benchmarks/bench_sections.py [--seasons 5] [--games 272] [--workers 2] [--repeat 20]
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import FILTER_STATES, recent_years, synthetic_facts, synthetic_game_log, timed  # noqa: E402
+from kickoff.figures import penalty_distribution, scoring_breakdown, season_combo, team_scatter  # noqa: E402
+from kickoff.queries import ALL_SEASONS, KickoffQueries, filter_params  # noqa: E402
+from kickoff.bootstrap import REPLICATES  # noqa: E402
+from kickoff.sections import Section, SectionRunner, _join_intervals  # noqa: E402
+
+# The dashboard's sections; logos are left out (the same placeholder image for every team)
+LOGO = 'data:image/png;base64,'
+SECTIONS = {
+    'team_scatter': Section('team', lambda summary: team_scatter(summary, [LOGO] * len(summary)), intervals=True),
+    'season_combo': Section('season', season_combo, intervals=True),
+    'scoring_breakdown': Section('season', scoring_breakdown),
+    'penalty_distribution': Section('penalty', penalty_distribution),
+}
+
+
+def inputs(i):
+    game, half, roof, return_type = FILTER_STATES[i % len(FILTER_STATES)]
+    return {'seasons': ALL_SEASONS, 'minutes_remaining_game': game, 'minutes_remaining_half': half,
+            'roof_type': roof, 'return_type': return_type}
+
+
+def sequential(engine, i):
+    filters = filter_params(**inputs(i))
+    summaries = engine.summaries(filters)
+    intervals = engine.intervals(filters, REPLICATES)
+    return {name: section.build(_join_intervals(summaries[section.grain], intervals[section.grain]) if section.intervals
+                                else summaries[section.grain])
+            for name, section in SECTIONS.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    years = recent_years(args.seasons)
+    kickoff_facts = synthetic_facts(synthetic_game_log(years, args.games), years)
+    engine = KickoffQueries(kickoff_facts)
+
+    # Warm up the lazy imports (pandas/plotly) and DuckDB before timing
+    sequential(engine, 0)
+
+    print(f'{args.seasons} seasons: {len(kickoff_facts)} kickoffs, {os.cpu_count()} CPUs; rerun times in ms')
+    print(f'{"":<22} {"median":>8} {"p90":>8}')
+    median, p90 = timed(lambda i: sequential(engine, i), args.repeat)
+    print(f'{"sequential":<22} {median:8.1f} {p90:8.1f}')
+    for workers in sorted({1, *args.workers}):
+        runner = SectionRunner(workers=workers, max_entries=0)
+        median, p90 = timed(lambda i: runner.compute(engine, SECTIONS, inputs(i)), args.repeat)
+        print(f'{f"sections ({workers} workers)":<22} {median:8.1f} {p90:8.1f}')
+    runner = SectionRunner(workers=max(args.workers))
+    for i in range(len(FILTER_STATES)):
+        runner.compute(engine, SECTIONS, inputs(i))
+    median, p90 = timed(lambda i: runner.compute(engine, SECTIONS, inputs(i)), args.repeat)
+    print(f'{"revisit":<22} {median:8.1f} {p90:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Load test of the dashboard with many concurrent viewers. Each simulated session is a Streamlit AppTest of the
+# dashboard (its own session state, sharing the process-wide caches like real sessions in one server process).
+# Sessions are opened in steps up to the largest count; at each step every open session makes a series of filter
+# changes at the same time, and each rerun's latency is recorded. Reported per step:
+#   - p50 / p99 rerun latency and reruns per second over all sessions
+#   - resident memory added per session opened in that step (measured after each new session's first run)
+#
+# The dashboard runs against synthetic fixture seasons and runs once per cursor pool size given, each in a
+# fresh process (the pool size is read at startup), e.g. 1 (queries run one at a time) against the default 8.
+# AppTest keeps each session's rendered elements in the test process, so memory per session is an upper bound
+#
+# Usage: python benchmarks/bench_sessions.py [--sessions 1 2 4 8 16] [--changes 10] [--cursors 1 8] [--games 60]
+import argparse
+import gc
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import FILTER_STATES, FIXTURE_SEASONS as SEASONS, ROOT, fixture_dir  # noqa: E402
+from kickoff import instrument  # noqa: E402
+
+
+def rss_mb():
+    return instrument.memory_kb('VmRSS:') / 1024
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run_child(steps, changes):
+    from streamlit.testing.v1 import AppTest
+
+    def open_session():
+        app = AppTest.from_file(os.path.join(ROOT, 'NFL_Kickoff_Analysis.py'), default_timeout=600)
+        app.run()
+        if app.exception:
+            raise SystemExit(f'script failed: {app.exception[0].message}')
+        return app
+
+    # The first session loads the shared data; memory is counted from there
+    sessions = [open_session()]
+    gc.collect()
+    memory = rss_mb()
+
+    results = []
+    for count in steps:
+        while len(sessions) < count:
+            sessions.append(open_session())
+        gc.collect()
+        added = (rss_mb() - memory) / max(1, count - results[-1]['sessions'] if results else count - 1)
+        memory = rss_mb()
+
+        latencies, errors = [], []
+        start = threading.Barrier(len(sessions))
+
+        def browse(app, offset):
+            start.wait()
+            for change in range(changes):
+                game, half, roof, return_type = FILTER_STATES[(offset + change) % len(FILTER_STATES)]
+                app.sidebar.slider[0].set_value(game)
+                app.sidebar.slider[1].set_value(half)
+                app.sidebar.selectbox[0].set_value(return_type)
+                app.sidebar.selectbox[1].set_value(roof)
+                began = time.perf_counter()
+                app.run()
+                latencies.append(time.perf_counter() - began)
+                if app.exception:
+                    errors.append(app.exception[0].message)
+
+        threads = [threading.Thread(target=browse, args=(app, i)) for i, app in enumerate(sessions)]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        if errors:
+            raise SystemExit(f'script failed: {errors[0]}')
+
+        results.append({'sessions': count, 'p50_ms': percentile(latencies, 0.5) * 1000, 'p99_ms': percentile(latencies, 0.99) * 1000,
+                        'reruns_per_s': len(latencies) / elapsed, 'mb_per_session': added if count > 1 else None})
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--changes', type=int, default=10, help='filter changes per session at each step')
+    parser.add_argument('--cursors', type=int, nargs='+', default=[1, 8], help='query cursor pool sizes to compare')
+    parser.add_argument('--games', type=int, default=60)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(sorted(args.sessions), args.changes)
+        return
+
+    from kickoff import synthetic
+    from kickoff.reference import ReferenceCache
+
+    # Fixture seasons are written once and reused (shared with bench_startup.py)
+    data_dir = fixture_dir(SEASONS, args.games, name='kickoff_startup_fixtures')
+
+    work = tempfile.mkdtemp(prefix='kickoff_sessions_')
+    cache_dir = os.path.join(work, 'cache')
+    try:
+        # Reference lookups come from the synthetic rosters instead of nfl_data_py (no network needed)
+        ReferenceCache(cache_dir, current_season=max(SEASONS), fetch_rosters=lambda year: synthetic.rosters([year]),
+                       fetch_teams=synthetic.teams).load(SEASONS)
+
+        print(f'{len(SEASONS)} fixture seasons x {args.games} games, {args.changes} filter changes per session per step')
+        print(f'{"cursors":>7} {"sessions":>8} {"p50 ms":>8} {"p99 ms":>8} {"reruns/s":>9} {"MB/session":>11}')
+        for cursors in args.cursors:
+            env = dict(os.environ, KICKOFF_PBP_SOURCE=data_dir, KICKOFF_CACHE_DIR=cache_dir, KICKOFF_ARTIFACT_DIR='',
+                       KICKOFF_QUERY_CURSORS=str(cursors))
+            output = subprocess.run([sys.executable, __file__, '--child', '--changes', str(args.changes),
+                                     '--sessions', *map(str, args.sessions)],
+                                    env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+            for row in json.loads(output.strip().splitlines()[-1]):
+                per_session = f"{row['mb_per_session']:11.1f}" if row['mb_per_session'] is not None else f'{"-":>11}'
+                print(f"{cursors:>7} {row['sessions']:>8} {row['p50_ms']:8.1f} {row['p99_ms']:8.1f} "
+                      f"{row['reruns_per_s']:9.1f} {per_session}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
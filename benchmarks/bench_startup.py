@@ -0,0 +1,133 @@
+# Startup cost of the dashboard: import time, and how long after the script starts the title, the filter
+# pane, the season range selector (drawn once the seasons are listed), the first chart and the whole page are
+# rendered. Each run is a fresh Python process running the script once through Streamlit's AppTest against
+# synthetic fixture seasons, in three situations:
+#   - cold:     empty cache directory, seasons are parsed from the fixture files
+#   - warm:     a new process with the on-disk caches filled by the cold run
+#   - artifact: artifact mode, reading a run published by python -m kickoff precompute
+#
+# Usage: python benchmarks/bench_startup.py [--games 60] [--repeat 3] [--script NFL_Kickoff_Analysis.py]
+#
+# --script can point at another version of the dashboard (e.g. from git show) saved in the repository root
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Libraries whose import is worth deferring; the child reports which were loaded when the filter pane was done
+HEAVY_MODULES = ['pandas', 'numpy', 'duckdb', 'pyarrow', 'plotly.express', 'nfl_data_py']
+
+
+def run_child(script):
+    started = time.perf_counter()
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter()
+
+    # Record when each element is sent to the browser
+    marks = []
+    enqueue = DeltaGenerator._enqueue
+
+    def recording_enqueue(self, delta_type, *args, **kwargs):
+        marks.append((delta_type, time.perf_counter(), [name for name in HEAVY_MODULES if name in sys.modules]))
+        return enqueue(self, delta_type, *args, **kwargs)
+
+    DeltaGenerator._enqueue = recording_enqueue
+
+    app = AppTest.from_file(os.path.join(ROOT, script), default_timeout=600)
+    script_start = time.perf_counter()
+    app.run()
+    finished = time.perf_counter()
+    if app.exception:
+        raise SystemExit(f'script failed: {app.exception[0].message}')
+
+    def first(delta_type, nth=1):
+        times = [(at, modules) for kind, at, modules in marks if kind == delta_type]
+        return times[nth - 1]
+
+    title, _ = first('heading')
+    filters, loaded = first('selectbox', 2)
+    seasons, _ = first('slider', 3)
+    chart, _ = first('plotly_chart')
+    print(json.dumps({'import_streamlit': imported - started, 'title': title - script_start,
+                      'filters': filters - script_start, 'seasons': seasons - script_start, 'first_chart': chart - script_start,
+                      'finished': finished - script_start, 'loaded_at_filters': loaded}))
+
+
+def child(script, env, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, __file__, '--child', script], env=env, cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def median(results, key):
+    values = sorted(result[key] for result in results)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--script', default='NFL_Kickoff_Analysis.py')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    # Imported here, not at the top: the child reports which libraries the script itself has loaded
+    from benchmarks.common import FIXTURE_SEASONS as SEASONS, fixture_dir
+    from kickoff import synthetic
+    from kickoff.reference import ReferenceCache
+
+    # Fixture seasons are written once and reused (shared with bench_sessions.py)
+    data_dir = fixture_dir(SEASONS, args.games, name='kickoff_startup_fixtures')
+
+    work = tempfile.mkdtemp(prefix='kickoff_startup_')
+    cache_dir = os.path.join(work, 'cache')
+    env = dict(os.environ, KICKOFF_PBP_SOURCE=data_dir, KICKOFF_CACHE_DIR=cache_dir, KICKOFF_ARTIFACT_DIR='')
+
+    def fill_reference():
+        # Reference lookups come from the synthetic rosters instead of nfl_data_py (no network needed)
+        ReferenceCache(cache_dir, current_season=max(SEASONS), fetch_rosters=lambda year: synthetic.rosters([year]),
+                       fetch_teams=synthetic.teams).load(SEASONS)
+
+    try:
+        rows = {}
+        cold = []
+        for _ in range(args.repeat):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            fill_reference()
+            cold += child(args.script, env, 1)
+        rows['cold'] = cold
+        rows['warm'] = child(args.script, env, args.repeat)
+
+        artifact_dir = os.path.join(work, 'artifacts')
+        subprocess.run([sys.executable, '-m', 'kickoff', 'precompute', '--output', artifact_dir, '--no-logos'],
+                       env=env, cwd=ROOT, capture_output=True, check=True)
+        rows['artifact'] = child(args.script, dict(env, KICKOFF_ARTIFACT_DIR=artifact_dir), args.repeat)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f'{args.script}, {len(SEASONS)} fixture seasons x {args.games} games, median of {args.repeat} processes (seconds)')
+    print(f'{"":<9} {"import":>7} {"title":>7} {"filters":>8} {"seasons":>8} {"chart":>7} {"done":>7}  loaded before filters rendered')
+    for name, results in rows.items():
+        print(f'{name:<9} {median(results, "import_streamlit"):7.2f} {median(results, "title"):7.2f} '
+              f'{median(results, "filters"):8.2f} {median(results, "seasons"):8.2f} {median(results, "first_chart"):7.2f} {median(results, "finished"):7.2f}  '
+              f'{", ".join(results[0]["loaded_at_filters"]) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
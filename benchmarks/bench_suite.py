@@ -0,0 +1,183 @@
+# Stage-by-stage cost of the dashboard pipeline at several data sizes, on synthetic nflverse-shaped seasons
+# (python -m kickoff synthetic). Every stage is timed (wall and CPU) and its peak memory measured:
+#   - ingest:      parse each season file and stack the kickoffs
+#   - reference:   slim the rosters and team table
+#   - facts:       the kickoff fact table (joins to the reference data)
+#   - engine:      load the fact table into the query layer
+#   - query_<grain>: one summary query per grain (season, team, penalty), over a few filter pane states
+#   - summaries:   the single GROUPING SETS pass the dashboard runs
+#   - cube_build, cube_summaries: the filter cube alternative
+#   - figure_<chart>: building each dashboard chart from the summaries
+#
+# Scales are numbers of 272-game seasons ending with 2024: 1x is one season, 5x five and 25x twenty five.
+# Results are written as JSON named after the commit, so two commits can be compared:
+#
+# Usage: python benchmarks/bench_suite.py [--scales 1 5 25] [--games 272] [--repeat 5] [--output FILE]
+#        python benchmarks/bench_suite.py --compare OLD.json NEW.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import duckdb  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly  # noqa: E402
+
+from benchmarks.common import FILTER_STATES, ROOT, fixture_dir, recent_years  # noqa: E402
+from kickoff import figures, instrument, synthetic  # noqa: E402
+from kickoff.aggregates import GRAINS, summary_sql  # noqa: E402
+from kickoff.cube import KickoffCube  # noqa: E402
+from kickoff.facts import build_kickoff_facts  # noqa: E402
+from kickoff.ingest import parse_season  # noqa: E402
+from kickoff.logos import _data_uri, _placeholder  # noqa: E402
+from kickoff.queries import KickoffQueries, filter_params  # noqa: E402
+from kickoff.reference import slim_rosters, slim_teams  # noqa: E402
+from kickoff.schema import concat_seasons  # noqa: E402
+from kickoff.sources import LocalSource  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+# Run a stage `repeat` times. Times are the median per run; peak is how far the resident memory rose above
+# where it was when the stage started (Linux only, see kickoff/instrument.py; elsewhere there is no peak)
+def measure(function, repeat=1):
+    can_reset = instrument.reset_peak()
+    before = instrument.memory_kb('VmRSS:')
+    walls, cpus = [], []
+    for i in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = function(i)
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    peak = (instrument.memory_kb('VmHWM:') - before) / 1024 if can_reset else None
+    stats = {'wall_ms': round(float(np.median(walls)) * 1000, 3), 'cpu_ms': round(float(np.median(cpus)) * 1000, 3),
+             'peak_mb': None if peak is None else round(max(peak, 0), 1), 'runs': repeat}
+    return result, stats
+
+
+def rows(result):
+    if isinstance(result, dict):
+        return sum(len(df) for df in result.values())
+    return len(result)
+
+
+def run_scale(data_dir, years, repeat):
+    stages = {}
+
+    def stage(name, function, repeat=1, count=rows):
+        result, stats = measure(function, repeat)
+        stats['rows'] = count(result) if count else None
+        stages[name] = stats
+        print(f"  {name:<28} {stats['wall_ms']:10.1f} ms wall {stats['cpu_ms']:10.1f} ms cpu "
+              f"{stats['peak_mb'] if stats['peak_mb'] is not None else '-':>8} MB peak"
+              + (f" {stats['rows']:>10} rows" if stats['rows'] is not None else ''))
+        return result
+
+    source = LocalSource(data_dir)
+    game_logs = stage('ingest', lambda i: concat_seasons([parse_season(source.path(year)) for year in years]))
+    kickers, team_names = stage('reference', lambda i: (slim_rosters(synthetic.rosters(years)), slim_teams(synthetic.teams())),
+                                count=lambda result: len(result[0]) + len(result[1]))
+    # The game logs are handed to the stage rather than closed over, so deleting them frees them for the query stages
+    kickoff_facts = stage('facts', lambda i, game_logs=game_logs: build_kickoff_facts(game_logs, kickers, team_names))
+    del game_logs
+
+    # Filter states cycle with the run number so repeated runs are not all the same query
+    params = [filter_params(*state) for state in FILTER_STATES]
+    queries = stage('engine', lambda i: KickoffQueries(kickoff_facts), count=None)
+    for grain in GRAINS:
+        sql = summary_sql((grain,))
+        stage(f'query_{grain}', lambda i: queries.run(sql, params[i % len(params)]), repeat * len(params))
+    stage('summaries', lambda i: queries.summaries(params[i % len(params)]), repeat * len(params))
+
+    cube = stage('cube_build', lambda i: KickoffCube.from_facts(kickoff_facts), count=None)
+    stage('cube_summaries', lambda i: cube.summaries(params[i % len(params)]), repeat * len(params))
+
+    # The logo of every team is the same placeholder, so no time goes into fetching logos
+    summaries = queries.summaries(params[0])
+    logo = _data_uri(_placeholder('NFL', 64))
+    team_agg = summaries['team']
+    stage('figure_team_scatter', lambda i: figures.team_scatter(team_agg, [logo] * len(team_agg)), repeat, count=None)
+    stage('figure_season_combo', lambda i: figures.season_combo(summaries['season']), repeat, count=None)
+    stage('figure_scoring_breakdown', lambda i: figures.scoring_breakdown(summaries['season']), repeat, count=None)
+    stage('figure_penalty_distribution', lambda i: figures.penalty_distribution(summaries['penalty']), repeat, count=None)
+    return stages
+
+
+def git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'versions': {'pandas': pd.__version__, 'duckdb': duckdb.__version__, 'numpy': np.__version__,
+                     'plotly': plotly.__version__},
+    }
+
+
+# Print each stage's time in two result files side by side
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'':<12} old {str(old['environment']['commit'])[:10]}  new {str(new['environment']['commit'])[:10]}")
+    print(f"{'scale':<6} {'stage':<28} {'old ms':>10} {'new ms':>10} {'new/old':>8} {'old MB':>8} {'new MB':>8}")
+    for scale, stages in new['scales'].items():
+        for name, stats in stages.items():
+            before = old['scales'].get(scale, {}).get(name)
+            if not before:
+                print(f"{scale:<6} {name:<28} {'-':>10} {stats['wall_ms']:10.1f}")
+                continue
+            ratio = stats['wall_ms'] / before['wall_ms'] if before['wall_ms'] else float('nan')
+            print(f"{scale:<6} {name:<28} {before['wall_ms']:10.1f} {stats['wall_ms']:10.1f} {ratio:8.2f} "
+                  f"{before['peak_mb'] if before['peak_mb'] is not None else '-':>8} "
+                  f"{stats['peak_mb'] if stats['peak_mb'] is not None else '-':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 5, 25], help='seasons per scale')
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each query per filter state and of each figure')
+    parser.add_argument('--data-dir', help='directory of play_by_play_{year}.csv.gz files (synthetic files are generated when missing)')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files instead of running')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Synthetic seasons are deterministic, so they are written once and shared by every scale and every commit
+    years = recent_years(max(args.scales))
+    data_dir = fixture_dir(years, args.games, data_dir=args.data_dir)
+
+    results = {'environment': environment(), 'games_per_season': args.games, 'repeat': args.repeat, 'scales': {}}
+    for scale in sorted(args.scales):
+        print(f'{scale}x: {scale} seasons x {args.games} games')
+        results['scales'][f'{scale}x'] = run_scale(data_dir, years[-scale:], args.repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(results['environment']['commit'] or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
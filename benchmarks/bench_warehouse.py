@@ -0,0 +1,91 @@
+# Cost of a dashboard data refresh while the current season is being played, with and without the warehouse:
+#   - rebuild:   what load_kickoff_queries did before: load every season through the season cache and run the
+#                fact query over all of them
+#   - warehouse: sync the persistent warehouse (only the current season is revalidated and only its new or
+#                changed games go through the fact query), then read the fact table out of it
+#
+# The current season grows one week (16 games) at a time. Each step times the refresh right after the new
+# week's file is published, and again with no change at the source (most 20 minute refreshes). The sync column
+# is the part of the warehouse refresh before the fact table is read out
+#
+# Usage: python benchmarks/bench_warehouse.py [--seasons 5] [--games 272] [--weeks 1 9 17]
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import assert_same_facts, recent_years, timed_call  # noqa: E402
+from kickoff import synthetic  # noqa: E402
+from kickoff.facts import build_kickoff_facts  # noqa: E402
+from kickoff.reference import slim_rosters, slim_teams  # noqa: E402
+from kickoff.schema import concat_seasons  # noqa: E402
+from kickoff.season_cache import SeasonCache  # noqa: E402
+from kickoff.sources import PBP_FILE_NAME, LocalSource  # noqa: E402
+from kickoff.warehouse import Warehouse, sync  # noqa: E402
+
+GAMES_PER_WEEK = 16
+
+
+# Publish the current season as it stands after `games` games
+def publish(data_dir, season, games):
+    played = season[season['game_id'].isin(season['game_id'].unique()[:games])]
+    with gzip.open(os.path.join(data_dir, PBP_FILE_NAME.format(year=int(season['season'].iloc[0]))), 'wt', compresslevel=1) as f:
+        played.to_csv(f, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--games', type=int, default=272)
+    parser.add_argument('--weeks', type=int, nargs='+', default=[1, 9, 17], help='weeks of the current season to time')
+    args = parser.parse_args()
+
+    years = recent_years(args.seasons)
+    current = max(years)
+    kickers, team_names = slim_rosters(synthetic.rosters(years)), slim_teams(synthetic.teams())
+
+    work = tempfile.mkdtemp(prefix='kickoff_warehouse_')
+    data_dir = os.path.join(work, 'data')
+    try:
+        synthetic.write_seasons(data_dir, years[:-1], games=args.games, filler_columns=False)
+        season = synthetic.season_frame(current, games=args.games, filler_columns=False)
+
+        rebuild_cache = SeasonCache(os.path.join(work, 'rebuild'), LocalSource(data_dir), current_season=current)
+        warehouse_cache = SeasonCache(os.path.join(work, 'warehouse'), LocalSource(data_dir), current_season=current)
+        warehouse = Warehouse(os.path.join(work, 'kickoffs.duckdb'), os.path.join(work, 'kickoff_facts'))
+
+        def rebuild():
+            return build_kickoff_facts(concat_seasons(rebuild_cache.load_many(years)), kickers, team_names)
+
+        def incremental():
+            sync_ms, counts = timed_call(lambda: sync(warehouse, warehouse_cache, years, kickers, team_names))
+            return warehouse.kickoff_facts(years), counts, sync_ms
+
+        # First refresh of the season: the closed seasons are loaded into both caches and the warehouse
+        publish(data_dir, season, GAMES_PER_WEEK * (min(args.weeks) - 1))
+        rebuild()
+        incremental()
+
+        print(f'{len(years)} seasons x {args.games} games; refresh times in ms')
+        print(f'{"week":>4} {"games":>6} {"":<10} {"rebuild":>9} {"warehouse":>10} {"(sync)":>8} {"rebuilt games":>14}')
+        for week in args.weeks:
+            publish(data_dir, season, GAMES_PER_WEEK * week)
+            # Source files are compared by size and modified time; make sure the new file looks changed
+            os.utime(LocalSource(data_dir).path(current), (time.time() + week, time.time() + week))
+            for label in ['new week', 'no change']:
+                rebuild_ms, expected = timed_call(rebuild)
+                warehouse_ms, (facts, counts, sync_ms) = timed_call(incremental)
+                assert_same_facts(expected, facts)
+                changed = sum(count['added'] + count['changed'] for count in counts)
+                print(f'{week:>4} {GAMES_PER_WEEK * week:>6} {label:<10} {rebuild_ms:9.1f} {warehouse_ms:10.1f} {sync_ms:8.1f} {changed:>14}')
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
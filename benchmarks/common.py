@@ -0,0 +1,198 @@
+# Pieces shared by the benchmarks and tests: the filter pane states they cycle through, timing, the synthetic
+# seasons and fact tables they run on, and the baseline the summaries and the warehouse are checked against.
+# Benchmarks and tests/conftest.py put the repository root on sys.path before importing this
+import itertools
+import os
+import tempfile
+import time
+
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff import synthetic
+from kickoff.facts import build_kickoff_facts
+from kickoff.reference import slim_rosters, slim_teams
+from kickoff.sources import LocalSource
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Synthetic seasons end with this one; fixture seasons for the dashboard runs (it shows every season the source has)
+LAST_SEASON = 2024
+FIXTURE_SEASONS = list(range(2020, LAST_SEASON + 1))
+
+# Filter pane states to cycle through while timing, like a user moving the sliders
+# (minutes in game, minutes in half, roof type, return type)
+FILTER_STATES = [((0, 60), (0, 30), 'Select All', 'Select All'),
+                 ((0, 45), (0, 30), 'Select All', 'Return'),
+                 ((10, 50), (2, 28), 'outdoors', 'Select All'),
+                 ((0, 60), (0, 10), 'dome', 'Touchback')]
+
+# Filter pane states checked for equality: slider ranges including empty and single-minute ones,
+# every roof type and every return type (180 states)
+GAME_MINUTES = [(0, 60), (10, 45), (0, 0), (59, 60)]
+HALF_MINUTES = [(0, 30), (0, 2), (15, 15)]
+ROOF_TYPES = ['Select All', 'outdoors', 'dome', 'closed', 'open']
+RETURN_TYPES = ['Select All', 'Touchback', 'Return']
+FILTER_GRID = list(itertools.product(GAME_MINUTES, HALF_MINUTES, ROOF_TYPES, RETURN_TYPES))
+
+
+# The last `count` seasons ending with LAST_SEASON
+def recent_years(count):
+    return list(range(LAST_SEASON - count + 1, LAST_SEASON + 1))
+
+
+# Run function(i) `repeat` times; median and p90 wall time in ms
+def timed(function, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(i)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.9)]
+
+
+# Run function() once; wall time in ms and its result
+def timed_call(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+# Directory of synthetic play_by_play_{year}.csv.gz files for the given seasons, written where missing and
+# reused by later runs. Defaults to a directory in the temp dir named after `name` and the number of games
+def fixture_dir(years, games=272, name='kickoff_bench', data_dir=None):
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), f'{name}_{games}')
+    missing = [year for year in years if not os.path.exists(LocalSource(data_dir).path(year))]
+    if missing:
+        print(f'Writing {len(missing)} synthetic seasons to {data_dir}')
+        synthetic.write_seasons(data_dir, missing, games=games)
+    return data_dir
+
+
+# Synthetic kickoff plays of the given seasons, generated in memory (no filler columns: only the retained
+# columns reach the facts)
+def synthetic_game_log(years, games=272):
+    return pd.concat([synthetic.season_frame(year, games=games, filler_columns=False) for year in years], ignore_index=True)
+
+
+# Kickoff fact table of a game log, joined to the synthetic rosters and teams of its seasons
+def synthetic_facts(game_log, years):
+    return build_kickoff_facts(game_log, slim_rosters(synthetic.rosters(years)), slim_teams(synthetic.teams()))
+
+
+# The season, team and penalty summary queries as the dashboard ran them before the measures were declared
+# once in kickoff/aggregates.py (one hand-written query per summary). The generated summaries and every
+# engine built on them are checked against these. They read the filtered kickoffs as "kickoffs".
+# The warehouse's fact table is checked against build_kickoff_facts the same way (assert_same_facts)
+
+# Summarize/aggregate the filtered kickoffs at the season level
+SEASON_AGG_SQL = """select
+                                season,
+                                count(*) as number_kickoffs,
+                                avg(yardline_100) as avg_starting_position,
+                                avg(case when kickoff_returner_player_id is not null and penalty=0 then yardline_100 end) as avg_starting_position_returns,
+                                avg(case when kickoff_returner_player_id is null and penalty=0 then yardline_100 end) as avg_starting_position_touchbacks,
+                                sum(case when touchdown=1 then 1 else 0 end)/(count(*)*1.0) as touchdown_return_rate,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') then 1 else 0 end)/(count(*)*1.0) as scoring_rate_on_drives_following_kickoffs,
+                                sum(case when fixed_drive_result in ('Touchdown') then 1 else 0 end)/(count(*)*1.0) as td_rate_on_drives_following_kickoffs,
+                                sum(case when fixed_drive_result in ('Field goal') then 1 else 0 end)/(count(*)*1.0) as fg_rate_on_drives_following_kickoffs,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') and kickoff_returner_player_id is not null then 1 else 0 end)/sum(case when kickoff_returner_player_id is not null then 1 else 0 end) as scoring_rate_on_drives_following_returns,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') and kickoff_returner_player_id is null then 1 else 0 end)/sum(case when kickoff_returner_player_id is null then 1 else 0 end) as scoring_rate_on_drives_following_touchbacks,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') and first_drive_flag = 1 then 1 else 0 end)/(sum(first_drive_flag)*1.0) as scoring_rate_on_first_drives_of_half,
+                                sum(injury)/(count(*)*1.0) as injury_rate,
+                                sum(injury) as injuries,
+                                sum(case when kickoff_returner_player_id is not null then 1 else 0 end)/(count(*)*1.0) as return_rate,
+                                sum(penalty) as penalties,
+                                sum(penalty)/(count(*)*1.0) as penalty_rate,
+                                count(*)/count(distinct game_id) as drives_after_kickoff_per_game
+                                
+                                from
+                                kickoffs
+                                
+                                group by
+                                season"""
+
+# Summarize/aggregate the filtered kickoffs at the team level
+TEAM_AGG_SQL = """select
+                                return_team_name,
+                                team_logo_espn as url,
+                                count(*) as number_kickoffs,
+                                avg(yardline_100) as avg_starting_position,
+                                avg(case when kickoff_returner_player_id is not null and penalty=0 then yardline_100 end) as avg_starting_position_returns,
+                                avg(case when kickoff_returner_player_id is null and penalty=0 then yardline_100 end) as avg_starting_position_touchbacks,
+                                sum(case when touchdown=1 then 1 else 0 end)/(count(*)*1.0) as touchdown_return_rate,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') then 1 else 0 end)/(count(*)*1.0) as scoring_rate_on_drives_following_kickoffs,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') and kickoff_returner_player_id is not null then 1 else 0 end)/sum(case when kickoff_returner_player_id is not null then 1 else 0 end) as scoring_rate_on_drives_following_returns,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') and kickoff_returner_player_id is null then 1 else 0 end)/sum(case when kickoff_returner_player_id is null then 1 else 0 end) as scoring_rate_on_drives_following_touchbacks,
+                                sum(case when fixed_drive_result in ('Field goal','Touchdown') and first_drive_flag = 1 then 1 else 0 end)/(sum(first_drive_flag)*1.0) as scoring_rate_on_first_drives_of_half,
+                                sum(injury)/(count(*)*1.0) as injury_rate,
+                                sum(injury) as injuries,
+                                sum(case when kickoff_returner_player_id is not null then 1 else 0 end)/(count(*)*1.0) as return_rate,
+                                sum(penalty) as penalties,
+                                sum(penalty)/(count(*)*1.0) as penalty_rate,
+                                count(*)/count(distinct game_id) as drives_after_kickoff_per_game
+                                
+                                from
+                                kickoffs a inner join
+                                (select max(season) as max_season
+                                   from kickoffs) b on a.season = b.max_season
+                                
+                                group by
+                                return_team_name,
+                                team_logo_espn"""
+
+# Summarize/aggregate the filtered kickoffs at the season and penalty level
+PENALTY_AGG_SQL = """select
+                                season,
+                                penalty_type,
+                                sum(penalty)/max(kickoffs_per_season) as penalty_rate
+                                
+                                from
+                                (select season, 
+                                        penalty_type,
+                                        penalty,
+                                        count(*) over(partition by season) as kickoffs_per_season
+
+                                  from kickoffs
+                                )
+                                
+                                group by
+                                season,
+                                penalty_type
+                            """
+
+
+BASELINE_SQL = {'season': SEASON_AGG_SQL, 'team': TEAM_AGG_SQL, 'penalty': PENALTY_AGG_SQL}
+
+
+# Season, team and penalty summaries of the baseline queries, run by run(sql) over the filtered kickoffs
+def baseline_summaries(run):
+    return {grain: run(sql) for grain, sql in BASELINE_SQL.items()}
+
+
+# Assert that summaries match the expected ones row for row, on the expected frames' columns (the generated
+# summaries carry a few more measures). Rows are compared sorted by their key columns, and a missing
+# penalty type compares equal whether it comes back as None or NaN
+def assert_same_summaries(expected, summaries):
+    for grain, old in expected.items():
+        new = summaries[grain][list(old.columns)]
+        key = list(old.columns[:2])
+        old = old.sort_values(key).reset_index(drop=True)
+        new = new.sort_values(key).reset_index(drop=True)
+        if 'penalty_type' in old:
+            old['penalty_type'] = old['penalty_type'].astype(object).where(old['penalty_type'].notna(), None)
+            new['penalty_type'] = new['penalty_type'].astype(object).where(new['penalty_type'].notna(), None)
+        pd.testing.assert_frame_equal(old, new, check_dtype=False, obj=f'{grain} summary')
+
+
+# Assert that a kickoff fact table read back from the warehouse matches one built in memory by
+# build_kickoff_facts. The warehouse stores categorical columns as text, so they are compared as text, and
+# rows are compared in a stable order
+FACT_KEYS = ['season', 'game_id', 'drive', 'series', 'game_seconds_remaining', 'desc']
+
+
+def assert_same_facts(expected, facts):
+    def comparable(df):
+        df = df.astype({name: 'str' for name, dtype in df.dtypes.items() if dtype == 'category'})
+        return df.sort_values(FACT_KEYS).reset_index(drop=True)
+    pd.testing.assert_frame_equal(comparable(facts), comparable(expected), check_dtype=False)
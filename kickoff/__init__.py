@@ -0,0 +1 @@
+# Data layer for the NFL Kickoff Analysis dashboard (NFL_Kickoff_Analysis.py)
@@ -0,0 +1,66 @@
+import argparse
+import logging
+
+from kickoff.config import ARTIFACT_DIR, FIRST_SEASON, LAST_SEASON, PBP_SOURCE, SEASONS
+from kickoff.precompute import precompute
+
+# Command line entry point, for running the dashboard's data work outside Streamlit (e.g. from a scheduler):
+#
+#   python -m kickoff precompute [--output DIR] [--seasons 2020 2021 ...] [--current-season YEAR] [--no-logos]
+#   python -m kickoff synthetic --output DIR [--seasons 2000-2024 ...] [--games 272] [--plays-per-game 170]
+#                               [--kickoff-rate 0.065] [--no-filler]
+#
+# Seasons can be given one by one or as ranges (2000-2024). precompute defaults to every season the play-by-play
+# source has between FIRST_SEASON and LAST_SEASON, like the dashboard
+
+
+def season_list(values):
+    years = []
+    for value in values:
+        first, _, last = value.partition('-')
+        years += range(int(first), int(last or first) + 1)
+    return sorted(set(years))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m kickoff')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    precompute_parser = commands.add_parser('precompute', help='build and publish the dashboard artifacts')
+    precompute_parser.add_argument('--output', default=ARTIFACT_DIR or 'artifacts',
+                                   help='artifact directory (default: $KICKOFF_ARTIFACT_DIR or ./artifacts)')
+    precompute_parser.add_argument('--seasons', nargs='+', help='default: every season the source has')
+    precompute_parser.add_argument('--current-season', type=int,
+                                   help='season still being played, revalidated against the source (default: latest season)')
+    precompute_parser.add_argument('--no-logos', dest='logos', action='store_false', help='do not fetch team logos')
+
+    synthetic_parser = commands.add_parser('synthetic', help='write deterministic nflverse-shaped play-by-play files')
+    synthetic_parser.add_argument('--output', required=True, help='directory for the play_by_play_{year}.csv.gz files')
+    synthetic_parser.add_argument('--seasons', nargs='+', default=[str(year) for year in SEASONS])
+    synthetic_parser.add_argument('--games', type=int, default=272, help='games per season (default: 272)')
+    synthetic_parser.add_argument('--plays-per-game', type=int, default=170)
+    synthetic_parser.add_argument('--kickoff-rate', type=float, default=0.065,
+                                  help='share of plays after the opening kickoffs that are kickoffs')
+    synthetic_parser.add_argument('--no-filler', dest='filler', action='store_false',
+                                  help='write only the retained columns instead of padding to the nflverse width')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.command == 'precompute':
+        if args.seasons:
+            years = season_list(args.seasons)
+        else:
+            from kickoff.sources import make_source
+            years = make_source(PBP_SOURCE).seasons(FIRST_SEASON, LAST_SEASON)
+        manifest = precompute(args.output, years, args.current_season, logos=args.logos)
+        print(f"Published run {manifest['run_id']} to {args.output}")
+    elif args.command == 'synthetic':
+        from kickoff.synthetic import write_seasons
+        paths = write_seasons(args.output, season_list(args.seasons), games=args.games, plays_per_game=args.plays_per_game,
+                              filler_columns=args.filler, kickoff_rate=args.kickoff_rate)
+        print(f'Wrote {len(paths)} seasons to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# Kickoff summary measures, declared once and shared by every grain the dashboard shows.
+# Each measure is a numerator summed over the kickoffs in a group, optionally divided by a summed denominator.
+# Keeping both parts additive means the same declarations can also be evaluated from pre-summed data
+
+# Row expressions used by several measures
+KICKOFF = '1'  # every kickoff counts once
+GAMES = 'distinct game_id'  # denominator: number of distinct games in the group
+RETURNED = 'case when kickoff_returner_player_id is not null then 1 else 0 end'
+TOUCHBACK = 'case when kickoff_returner_player_id is null then 1 else 0 end'
+SCORED = "fixed_drive_result in ('Field goal','Touchdown')"
+
+# (measure name, numerator row expression, denominator row expression or None for a plain total)
+MEASURES = [
+    ('number_kickoffs', KICKOFF, None),
+    ('avg_starting_position', 'yardline_100', 'case when yardline_100 is not null then 1 else 0 end'),
+    ('avg_starting_position_returns',
+     'case when kickoff_returner_player_id is not null and penalty=0 then yardline_100 end',
+     'case when kickoff_returner_player_id is not null and penalty=0 and yardline_100 is not null then 1 else 0 end'),
+    ('avg_starting_position_touchbacks',
+     'case when kickoff_returner_player_id is null and penalty=0 then yardline_100 end',
+     'case when kickoff_returner_player_id is null and penalty=0 and yardline_100 is not null then 1 else 0 end'),
+    ('touchdown_return_rate', 'case when touchdown=1 then 1 else 0 end', KICKOFF),
+    ('scoring_rate_on_drives_following_kickoffs', f'case when {SCORED} then 1 else 0 end', KICKOFF),
+    ('td_rate_on_drives_following_kickoffs', "case when fixed_drive_result in ('Touchdown') then 1 else 0 end", KICKOFF),
+    ('fg_rate_on_drives_following_kickoffs', "case when fixed_drive_result in ('Field goal') then 1 else 0 end", KICKOFF),
+    ('scoring_rate_on_drives_following_returns', f'case when {SCORED} and kickoff_returner_player_id is not null then 1 else 0 end', RETURNED),
+    ('scoring_rate_on_drives_following_touchbacks', f'case when {SCORED} and kickoff_returner_player_id is null then 1 else 0 end', TOUCHBACK),
+    ('scoring_rate_on_first_drives_of_half', f'case when {SCORED} and first_drive_flag = 1 then 1 else 0 end', 'first_drive_flag'),
+    ('injury_rate', 'injury', KICKOFF),
+    ('injuries', 'injury', None),
+    ('return_rate', RETURNED, KICKOFF),
+    ('penalties', 'penalty', None),
+    ('penalty_rate', 'penalty', KICKOFF),
+    ('drives_after_kickoff_per_game', KICKOFF, GAMES),
+]
+
+MEASURE_NAMES = [name for name, numerator, denominator in MEASURES]
+
+# Group-by columns of each summary the dashboard shows
+GRAINS = {
+    'season': ['season'],                                         # season level
+    'team': ['season', 'return_team_name', 'team_logo_espn'],     # team level (latest season is picked afterwards)
+    'penalty': ['season', 'penalty_type'],                        # season and penalty level
+}
+
+
+# SQL aggregate for the total of a row expression
+def _total(expression):
+    if expression == KICKOFF:
+        return 'count(*)'
+    if expression == GAMES:
+        return 'count(distinct game_id)'
+    return f'sum({expression})'
+
+
+# SQL aggregate for one measure
+def measure_sql(numerator, denominator):
+    if denominator is None:
+        return _total(numerator)
+    return f'{_total(numerator)}/({_total(denominator)}*1.0)'
+
+
+# One query that computes every measure for the requested grains in a single scan of "kickoffs" using
+# GROUPING SETS. The grain column says which grouping set each output row belongs to
+def summary_sql(grains=tuple(GRAINS)):
+    columns = list(dict.fromkeys(column for grain in grains for column in GRAINS[grain]))
+
+    # Label each row with its grain: its own columns are grouped, every other grain column is not
+    if len(grains) == 1:
+        grain_label = f"'{grains[0]}'"
+    else:
+        cases = []
+        for grain in grains:
+            conditions = [f'grouping({column}) = {0 if column in GRAINS[grain] else 1}' for column in columns]
+            cases.append(f"when {' and '.join(conditions)} then '{grain}'")
+        grain_label = f"case {' '.join(cases)} end"
+
+    measures = ',\n                                '.join(f'{measure_sql(numerator, denominator)} as {name}'
+                                                           for name, numerator, denominator in MEASURES)
+    grouping_sets = ', '.join(f"({', '.join(GRAINS[grain])})" for grain in grains)
+
+    return f"""select
+                                {grain_label} as grain,
+                                {', '.join(columns)},
+                                {measures}
+
+                                from
+                                kickoffs
+
+                                group by grouping sets ({grouping_sets})"""
+
+
+# Season, team and season x penalty summaries in one pass
+SUMMARY_SQL = summary_sql()
+
+
+# Measures the charts show with bootstrap confidence intervals (see kickoff/bootstrap.py), for the season and
+# team summaries. Each is a ratio of two additive totals, so it can be recomputed from resampled games
+INTERVAL_MEASURES = ['scoring_rate_on_drives_following_kickoffs', 'return_rate', 'avg_starting_position',
+                     'avg_starting_position_returns']
+INTERVAL_GRAINS = ('season', 'team')
+
+# Key columns of the season and team summaries, as split_summaries returns them
+SUMMARY_KEYS = {'season': ['season'], 'team': ['return_team_name', 'url']}
+
+
+# Per-game totals of every interval measure's numerator (num_<i>) and denominator (den_<i>) in "kickoffs", per
+# season, return team and game. Both interval grains come from this one scan (see split_clusters)
+def cluster_sql():
+    measures = {name: (numerator, denominator) for name, numerator, denominator in MEASURES}
+    totals = ',\n                                '.join(
+        f'{_total(numerator)} as num_{i}, {_total(denominator)} as den_{i}'
+        for i, (numerator, denominator) in enumerate(measures[name] for name in INTERVAL_MEASURES))
+
+    return f"""select
+                                season,
+                                return_team_name,
+                                team_logo_espn as url,
+                                game_id,
+                                {totals}
+
+                                from
+                                kickoffs
+
+                                group by all"""
+
+
+CLUSTER_SQL = cluster_sql()
+
+
+# Split the per-game totals into those of each interval grain, keyed like its summary: per season and game (the
+# totals are additive, so a game's return teams add up), and per return team and game. Like the team summary,
+# the team grain only covers the latest season
+def split_clusters(clusters):
+    totals = [column for column in clusters.columns if column.startswith(('num_', 'den_'))]
+    season = clusters.groupby(['season', 'game_id'], sort=False, as_index=False)[totals].sum()
+    team = clusters[clusters['season'] == clusters['season'].max()]
+    return {'season': season, 'team': team[['return_team_name', 'url', 'game_id'] + totals].reset_index(drop=True)}
+
+
+# Split a summary result into the frames the charts use, shaped like the per-grain queries they replace
+def split_summaries(summary, grains=tuple(GRAINS)):
+    summaries = {}
+
+    if 'season' in grains:
+        kickoffs_agg = summary[summary['grain'] == 'season']
+        summaries['season'] = kickoffs_agg[['season'] + MEASURE_NAMES].reset_index(drop=True)
+
+    if 'team' in grains:
+        # Team level is only shown for the latest season in the data
+        kickoffs_team_agg = summary[summary['grain'] == 'team']
+        kickoffs_team_agg = kickoffs_team_agg[kickoffs_team_agg['season'] == kickoffs_team_agg['season'].max()]
+        kickoffs_team_agg = kickoffs_team_agg.rename(columns={'team_logo_espn': 'url'})
+        summaries['team'] = kickoffs_team_agg[['return_team_name', 'url'] + MEASURE_NAMES].reset_index(drop=True)
+
+    if 'penalty' in grains:
+        # Penalty types split each season's kickoffs, so their kickoff counts add up to the season total
+        penalty_agg = summary[summary['grain'] == 'penalty']
+        kickoffs_per_season = penalty_agg.groupby('season')['number_kickoffs'].transform('sum')
+        penalty_agg = penalty_agg.assign(penalty_rate=penalty_agg['penalties'] / kickoffs_per_season)
+        summaries['penalty'] = penalty_agg[['season', 'penalty_type', 'penalty_rate']].reset_index(drop=True)
+
+    return summaries
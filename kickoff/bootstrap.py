@@ -0,0 +1,96 @@
+import numpy as np  # Vectorized resampling and sums
+import pandas as pd  # Data manipulation and analysis
+
+# Game-clustered bootstrap confidence intervals for the ratio measures of a summary (rates and averages such
+# as scoring_rate_on_drives_following_kickoffs = scoring drives / kickoffs). Kickoffs of the same game are not
+# independent, so whole games are resampled: each group (a team or a season) draws as many games as it has,
+# with replacement, and the measure is recomputed from the drawn games' numerator and denominator totals.
+#
+# Replicates are computed in batches, not one by one. A batch draws one (replicates x games) array of game
+# indices, each index drawn within its own group's games, and counts how often every game was drawn in every
+# replicate (np.bincount). Those counts are the weights of each game's totals: one batched matrix product of the
+# counts with the games' numerator and denominator totals (laid out group by group) gives every group's totals
+# in every replicate of the batch. Batches are sized to keep the arrays to a few MB however many games there are.
+# The interval is the percentile interval of the replicate ratios. Draws use a fixed seed, so the same
+# kickoffs always give the same interval
+
+LEVEL = 0.95  # confidence level of the intervals
+REPLICATES = 2000
+BATCH_ELEMENTS = 2 ** 21  # draws (replicates x games) per batch
+
+
+# Percentile interval of each group and measure, from per-game totals.
+#   groups:        group number of each game (any order)
+#   numerators:    (games x measures) totals of each measure's numerator per game
+#   denominators:  (games x measures) totals of each measure's denominator per game
+# Returns (low, high), each (groups x measures) for the groups in sorted order. Replicates whose denominator
+# is zero (e.g. no returns drawn) are left out; a group with none left gets NaN
+def cluster_bootstrap(groups, numerators, denominators, replicates=REPLICATES, level=LEVEL, seed=0):
+    totals = np.concatenate([np.asarray(numerators, dtype=float), np.asarray(denominators, dtype=float)], axis=1)
+    measures = totals.shape[1] // 2
+    if not len(totals):
+        empty = np.zeros((0, measures))
+        return empty, empty
+
+    # Games sorted by group and laid out as (groups x most games) slots, zero padded
+    _, group_of_game = np.unique(np.asarray(groups), return_inverse=True)
+    order = np.argsort(group_of_game, kind='stable')
+    group_of_game = group_of_game[order]
+    sizes = np.bincount(group_of_game)
+    slot = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    layout = np.zeros((len(sizes), sizes.max(), totals.shape[1]))
+    layout[group_of_game, slot] = totals[order]
+    group_count, slot_count = len(sizes), sizes.max()
+    size_of_game = sizes[group_of_game]
+
+    rng = np.random.default_rng(seed)
+    ratios = np.empty((replicates, group_count, measures))
+    step = max(1, BATCH_ELEMENTS // max(len(order), group_count * slot_count))
+    for first in range(0, replicates, step):
+        count = min(step, replicates - first)
+
+        # Each game's place in its group is filled by a game of the same group, drawn uniformly
+        draws = (rng.random((count, len(order))) * size_of_game).astype(np.int64)
+        cells = (np.arange(count)[:, None] * group_count + group_of_game) * slot_count + draws
+        weights = np.bincount(cells.ravel(), minlength=count * group_count * slot_count)
+        weights = weights.reshape(count, group_count, slot_count).transpose(1, 0, 2).astype(float)
+
+        # (groups x replicates x slots) @ (groups x slots x totals): every group's totals in every replicate
+        sums = np.matmul(weights, layout).transpose(1, 0, 2)
+        numerator_totals, denominator_totals = sums[..., :measures], sums[..., measures:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios[first:first + count] = np.where(denominator_totals != 0, numerator_totals / denominator_totals, np.nan)
+
+    return _percentiles(ratios, [(1 - level) / 2, 1 - (1 - level) / 2])
+
+
+# Percentiles along the first axis skipping NaN (sorted to the end), interpolated linearly like np.quantile
+def _percentiles(values, quantiles):
+    values = np.sort(values, axis=0)
+    last = np.maximum((~np.isnan(values)).sum(axis=0) - 1, 0)
+    results = []
+    for quantile in quantiles:
+        position = last * quantile
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, last)
+        low = np.take_along_axis(values, below[None], axis=0)[0]
+        high = np.take_along_axis(values, above[None], axis=0)[0]
+        results.append(low + (high - low) * (position - below))
+    return results
+
+
+# Intervals for a frame of per-game totals: key columns, then num_<i> and den_<i> per measure (as returned by
+# kickoff.aggregates.cluster_sql). Returns the keys with <measure>_low and <measure>_high for every measure
+def game_intervals(clusters, keys, measures, replicates=REPLICATES, level=LEVEL):
+    groups = clusters.groupby(keys, sort=True, dropna=False)
+    codes = groups.ngroup().to_numpy()
+    intervals = groups.size().index.to_frame(index=False)
+
+    columns = range(len(measures))
+    low, high = cluster_bootstrap(codes, clusters[[f'num_{i}' for i in columns]].to_numpy(dtype=float, na_value=0.0),
+                                  clusters[[f'den_{i}' for i in columns]].to_numpy(dtype=float, na_value=0.0),
+                                  replicates, level)
+    for i, measure in enumerate(measures):
+        intervals[f'{measure}_low'] = low[:, i]
+        intervals[f'{measure}_high'] = high[:, i]
+    return pd.DataFrame(intervals)
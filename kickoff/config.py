@@ -0,0 +1,74 @@
+import datetime
+import os
+
+# Seasons shown on the dashboard: every season from FIRST_SEASON to LAST_SEASON the play-by-play source has a
+# file for (see the sources' seasons() in kickoff/sources.py). nflverse play-by-play starts in 1999, and a season
+# is named after the year it starts in (September), so LAST_SEASON defaults to the season of today's date
+_today = datetime.date.today()
+FIRST_SEASON = int(os.environ.get('KICKOFF_FIRST_SEASON', 1999))
+LAST_SEASON = int(os.environ.get('KICKOFF_LAST_SEASON', _today.year if _today.month >= 9 else _today.year - 1))
+SEASONS = list(range(FIRST_SEASON, LAST_SEASON + 1))
+
+# Seconds each request checking which seasons the source has may take. The season range selector waits on the
+# check, so it is kept short; when it fails the dashboard shows the seasons it already has
+SEASON_PROBE_TIMEOUT = float(os.environ.get('KICKOFF_SEASON_PROBE_TIMEOUT', 3))
+
+# How many of the latest seasons the season range selector starts with
+DEFAULT_SEASONS = int(os.environ.get('KICKOFF_DEFAULT_SEASONS', 5))
+
+# Where the play-by-play season files are read from. Accepts the nflverse release URL,
+# a file:// URL or a plain local directory (handy for working offline against fixture files)
+PBP_SOURCE = os.environ.get('KICKOFF_PBP_SOURCE', 'https://github.com/nflverse/nflverse-data/releases/download/pbp')
+
+# Directory that holds the on-disk cache (one Parquet file plus a metadata file per season)
+CACHE_DIR = os.environ.get('KICKOFF_CACHE_DIR', '.kickoff_cache')
+
+# Persistent DuckDB database keeping track of the kickoff fact table (see kickoff/warehouse.py). Refreshes only
+# rebuild the games that changed. Several processes can share it: it is only open while one of them syncs.
+# Set KICKOFF_WAREHOUSE to an empty string to rebuild the fact table in memory instead
+WAREHOUSE_PATH = os.environ.get('KICKOFF_WAREHOUSE', os.path.join(CACHE_DIR, 'kickoffs.duckdb'))
+
+# Season-partitioned Parquet dataset of the kickoff fact table (see kickoff/dataset.py), written by the warehouse
+# and queried in place by the SQL engine
+DATASET_DIR = os.environ.get('KICKOFF_DATASET', os.path.join(CACHE_DIR, 'kickoff_facts'))
+
+# Memory DuckDB may use for the summary queries before it spills to disk
+MEMORY_LIMIT = os.environ.get('KICKOFF_MEMORY_LIMIT', '1GB')
+
+# Directory of the resized team logos drawn on the team scatter plot
+LOGO_DIR = os.path.join(CACHE_DIR, 'logos')
+
+# Worker counts for loading seasons: seasons are fetched on a thread pool and parsed by DuckDB's
+# multithreaded CSV reader using at most PARSE_WORKERS threads. Set FETCH_WORKERS to 1 to load one season at a time
+FETCH_WORKERS = int(os.environ.get('KICKOFF_FETCH_WORKERS', 8))
+PARSE_WORKERS = int(os.environ.get('KICKOFF_PARSE_WORKERS', os.cpu_count() or 1))
+
+# Engine answering the dashboard summaries: 'sql' filters the kickoff fact table with parameterized
+# queries, 'cube' adds up pre-aggregated cells and never touches row-level data after the build
+ENGINE = os.environ.get('KICKOFF_ENGINE', 'sql')
+
+# Most summary queries the SQL engine runs at once, each on its own cursor of the shared connection;
+# sessions beyond that wait for a cursor
+QUERY_CURSORS = int(os.environ.get('KICKOFF_QUERY_CURSORS', 8))
+
+# Worker threads running the chart sections' summaries and intervals queries at the same time (the figures are
+# built on the script thread, so more than two only sit idle)
+CHART_WORKERS = int(os.environ.get('KICKOFF_CHART_WORKERS', 2))
+
+# Bootstrap replicates behind the confidence intervals drawn on the team scatter and season charts
+# (see kickoff/bootstrap.py); 0 draws the charts without intervals
+BOOTSTRAP_REPLICATES = int(os.environ.get('KICKOFF_BOOTSTRAP_REPLICATES', 2000))
+
+# Seconds before the current season's kicker list and the team table are refetched (closed seasons never are)
+REFERENCE_MAX_AGE = int(os.environ.get('KICKOFF_REFERENCE_MAX_AGE', 86400))
+
+# Directory of precomputed artifacts (python -m kickoff precompute). When set, the dashboard runs in artifact
+# mode: it only reads the latest published artifacts and never downloads or joins anything itself
+ARTIFACT_DIR = os.environ.get('KICKOFF_ARTIFACT_DIR', '')
+
+# Per-stage instrumentation (see kickoff/instrument.py): set KICKOFF_INSTRUMENT=0 to record nothing. Each rerun is
+# logged as one JSON line; the debug sidebar panel showing the last DEBUG_RERUNS reruns and the cache hit/miss
+# counts is opt-in, with KICKOFF_DEBUG_PANEL=1 or ?debug=1 in the page URL
+INSTRUMENT = os.environ.get('KICKOFF_INSTRUMENT', '1') != '0'
+DEBUG_PANEL = os.environ.get('KICKOFF_DEBUG_PANEL', '0') == '1'
+DEBUG_RERUNS = int(os.environ.get('KICKOFF_DEBUG_RERUNS', 20))
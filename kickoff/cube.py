@@ -0,0 +1,203 @@
+import duckdb  # Used to write SQL inside Python script
+import numpy as np  # Vectorized sums and bitmap merges
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff.aggregates import GAMES, GRAINS, KICKOFF, MEASURE_NAMES, MEASURES, split_summaries
+from kickoff.dataset import scan_sql
+
+# Pre-aggregated filter cube: an optional engine that answers the dashboard summaries without touching
+# row-level data. Kickoffs are summed once into cells keyed by the filter pane dimensions, and any filter
+# combination is answered by adding up the matching cells. It is a drop-in for KickoffQueries.summaries.
+#
+# The minute sliders filter on seconds/60.0 BETWEEN whole minutes, so a kickoff's minute key is twice its
+# whole minutes remaining, plus one when it is not exactly on the minute. A kickoff then matches the range
+# a..b exactly when its key is between 2a and 2b.
+#
+# Distinct games (for drives_after_kickoff_per_game) are not additive, so each cell also keeps an exact
+# bitmap of the games it covers, numbered within the season. Merging cells ORs their bitmaps
+
+# Filter pane dimensions shared by both cubes
+FILTER_KEYS = ['game_minute_key', 'half_minute_key', 'roof', 'returned']
+
+# Season cube answers the season and season x penalty summaries; team cube answers the team summary
+SEASON_KEYS = ['season', 'penalty_type'] + FILTER_KEYS
+TEAM_KEYS = ['season', 'return_team_name', 'team_logo_espn'] + FILTER_KEYS
+
+# Row expressions summed into every cell, one column each (counts and distinct games are handled separately)
+SUMMED = list(dict.fromkeys(expression for name, numerator, denominator in MEASURES
+                            for expression in (numerator, denominator)
+                            if expression not in (None, KICKOFF, GAMES)))
+SUM_COLUMNS = {expression: f'sum_{i}' for i, expression in enumerate(SUMMED)}
+
+# Columns of a summary result, as returned by the SQL summary query
+SUMMARY_COLUMNS = ['grain'] + list(dict.fromkeys(column for keys in GRAINS.values() for column in keys)) + MEASURE_NAMES
+
+
+def _minute_key(column):
+    return f'cast(2*floor({column}/60) + case when {column} % 60 = 0 then 0 else 1 end as integer)'
+
+
+# SQL that sums the fact table into cells for the given keys
+def _cells_sql(keys):
+    key_expressions = {
+        'game_minute_key': f"{_minute_key('game_seconds_remaining')} as game_minute_key",
+        'half_minute_key': f"{_minute_key('half_seconds_remaining')} as half_minute_key",
+        'returned': 'case when kickoff_returner_player_id is not null then 1 else 0 end as returned',
+    }
+    sums = ',\n                   '.join(f'sum({expression}) as {column}' for expression, column in SUM_COLUMNS.items())
+    return f"""select {', '.join(key_expressions.get(key, key) for key in keys)},
+                   count(*) as kickoffs,
+                   {sums},
+                   list(distinct game_index) as games
+            from (select *, dense_rank() over(partition by season order by game_id) - 1 as game_index
+                  from kickoff_facts)
+            group by all
+            order by season"""
+
+
+# Turn each cell's list of game numbers into a row of 64-bit words with those bits set
+def _bitmaps(games, words):
+    lengths = games.map(len).to_numpy()
+    cells = np.repeat(np.arange(len(games)), lengths)
+    numbers = np.concatenate(games.to_list()).astype(np.int64) if len(games) else np.zeros(0, np.int64)
+    bitmaps = np.zeros((len(games), words), dtype=np.uint64)
+    np.bitwise_or.at(bitmaps, (cells, numbers // 64), np.left_shift(np.uint64(1), (numbers % 64).astype(np.uint64)))
+    return bitmaps
+
+
+def _popcount(bitmaps):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitmaps).sum(axis=1)
+    return np.unpackbits(bitmaps.view(np.uint8), axis=1).sum(axis=1)
+
+
+# Cells of one cube held as plain arrays, plus their game bitmaps and a group number per cell for each
+# summary the cube answers. A query is a boolean mask over the cells followed by per-group sums
+class _Cells:
+
+    def __init__(self, cells, words, groupings):
+        cells = cells.reset_index(drop=True)
+        self.bitmaps = _bitmaps(cells.pop('games'), words)
+
+        # Filter pane dimensions (a missing minute key is NaN and never matches a range, like SQL BETWEEN on NULL)
+        self.game_minute_key = cells['game_minute_key'].to_numpy(dtype=float, na_value=np.nan)
+        self.half_minute_key = cells['half_minute_key'].to_numpy(dtype=float, na_value=np.nan)
+        self.roof = cells['roof'].to_numpy(dtype=object)
+        self.returned = cells['returned'].to_numpy()
+        self.season = cells['season'].to_numpy()
+
+        # Additive measures. A cell sum is missing when every kickoff in the cell had a missing value
+        self.kickoffs = cells['kickoffs'].to_numpy(dtype=float)
+        self.sums = {column: cells[column].to_numpy(dtype=float, na_value=np.nan) for column in SUM_COLUMNS.values()}
+
+        # Group number of every cell for each summary, and the group keys in group number order
+        self.groupings = {}
+        for grain, by in groupings.items():
+            groups = cells.groupby(by, sort=True, dropna=False)
+            keys = groups.size().index.to_frame(index=False)
+            self.groupings[grain] = (groups.ngroup().to_numpy(), {key: keys[key].to_numpy() for key in by})
+
+    # Cells matching the filter pane
+    def select(self, filters):
+        keep = (self.season >= filters['season_from']) & (self.season <= filters['season_to'])
+        keep &= (self.game_minute_key >= 2 * filters['game_minutes_from']) & (self.game_minute_key <= 2 * filters['game_minutes_to'])
+        keep &= (self.half_minute_key >= 2 * filters['half_minutes_from']) & (self.half_minute_key <= 2 * filters['half_minutes_to'])
+        if filters['roof_type'] != 'Select All':
+            keep &= self.roof == filters['roof_type']
+        if filters['return_type'] == 'Touchback':
+            keep &= self.returned == 0
+        elif filters['return_type'] == 'Return':
+            keep &= self.returned == 1
+        return keep
+
+    # Add up the selected cells per group and evaluate every measure, like the SQL summary does
+    def summarize(self, keep, grain):
+        codes, keys = self.groupings[grain]
+        size = len(next(iter(keys.values())))
+        codes = codes[keep]
+
+        kickoffs = np.bincount(codes, weights=self.kickoffs[keep], minlength=size)
+
+        # Sums skip missing values; a group with no values at all stays missing (SQL sum of only NULLs)
+        totals = {}
+        for column, values in self.sums.items():
+            values = values[keep]
+            missing = np.isnan(values)
+            totals[column] = np.bincount(codes, weights=np.where(missing, 0.0, values), minlength=size)
+            if missing.any():
+                totals[column][np.bincount(codes, weights=~missing, minlength=size) == 0] = np.nan
+
+        # OR the game bitmaps of each group's cells, then count the bits
+        games = np.zeros(size)
+        if len(codes):
+            order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[order]
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+            games[sorted_codes[starts]] = _popcount(np.bitwise_or.reduceat(self.bitmaps[keep][order], starts, axis=0))
+
+        def total(expression):
+            if expression == KICKOFF:
+                return kickoffs
+            if expression == GAMES:
+                return games
+            return totals[SUM_COLUMNS[expression]]
+
+        # Only groups with at least one matching kickoff appear in the result
+        # (columns are collected first and the frame built once, which is much cheaper than adding them one by one)
+        present = kickoffs > 0
+        columns = {'grain': grain}
+        columns.update({key: values[present] for key, values in keys.items()})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, numerator, denominator in MEASURES:
+                value = total(numerator) if denominator is None else total(numerator) / (total(denominator) * 1.0)
+                columns[name] = value[present]
+        columns['number_kickoffs'] = columns['number_kickoffs'].astype('int64')
+        return pd.DataFrame(columns)
+
+
+# Cells of both cubes for a kickoff fact table (a DataFrame or a dataset directory, see kickoff/dataset.py):
+# (season cells, team cells). Each cell lists the numbers of the games it covers; the cells are what the cube
+# is built from, and what precompute stores
+def cube_cells(kickoff_facts):
+    con = duckdb.connect()
+    try:
+        if isinstance(kickoff_facts, str):
+            con.execute(f'create view kickoff_facts as select * from {scan_sql(kickoff_facts)}')
+        else:
+            con.register('kickoff_facts', kickoff_facts)
+        return con.execute(_cells_sql(SEASON_KEYS)).df(), con.execute(_cells_sql(TEAM_KEYS)).df()
+    finally:
+        con.close()
+
+
+class KickoffCube:
+
+    def __init__(self, season_cells, team_cells):
+        # Bitmaps are wide enough for the highest game number of any season
+        numbers = season_cells['games'].to_list()
+        most_games = int(np.concatenate(numbers).max()) + 1 if numbers else 0
+        words = max(1, -(-most_games // 64))
+
+        self.season_cells = _Cells(season_cells, words, {grain: GRAINS[grain] for grain in ('season', 'penalty')})
+
+        # Team cells are kept per season: the team summary only ever reads the latest season with data,
+        # so its cost does not grow as seasons are added
+        self.team_cells = {season: _Cells(cells, words, {'team': GRAINS['team']})
+                           for season, cells in team_cells.groupby('season')}
+
+    # Build the cube straight from a kickoff fact table
+    @classmethod
+    def from_facts(cls, kickoff_facts):
+        return cls(*cube_cells(kickoff_facts))
+
+    # Season, team (latest season) and season x penalty summaries, shaped like KickoffQueries.summaries
+    def summaries(self, filters):
+        keep = self.season_cells.select(filters)
+        parts = [self.season_cells.summarize(keep, 'season'), self.season_cells.summarize(keep, 'penalty')]
+
+        # Latest season that has any kickoff matching the filters
+        if keep.any():
+            team_cells = self.team_cells[self.season_cells.season[keep].max()]
+            parts.append(team_cells.summarize(team_cells.select(filters), 'team'))
+
+        return split_summaries(pd.concat(parts, ignore_index=True).reindex(columns=SUMMARY_COLUMNS))
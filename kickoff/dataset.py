@@ -0,0 +1,68 @@
+import glob
+import os
+import threading
+
+import duckdb  # Used to write SQL inside Python script
+
+# Season-partitioned Parquet dataset of the kickoff fact table, laid out the hive way, one file per season:
+#
+#   <dataset dir>/season=2023/kickoffs.parquet
+#
+# The season is the partition key and is not stored inside the files. DuckDB queries the dataset in place
+# (scan_sql), so the fact table never has to be loaded into memory: a filter on season only opens the partitions
+# in range (partition pruning, also with the season range bound as a query parameter) and only the columns a
+# query uses are read from them.
+#
+# A partition is always replaced whole: written under a temporary name and renamed into place, so a query
+# running meanwhile reads either the old or the new file, never half of one
+
+FILE_NAME = 'kickoffs.parquet'
+
+
+def partition_path(directory, year):
+    return os.path.join(directory, f'season={int(year)}', FILE_NAME)
+
+
+# Seasons that have a partition, in order
+def seasons(directory):
+    return sorted(int(os.path.basename(os.path.dirname(path))[len('season='):])
+                  for path in glob.glob(os.path.join(directory, 'season=*', FILE_NAME)))
+
+
+def _quote(path):
+    return "'" + path.replace("'", "''") + "'"
+
+
+# SQL table function reading the whole dataset, with season as a column
+def scan_sql(directory):
+    return (f"read_parquet({_quote(os.path.join(directory, 'season=*', FILE_NAME))}, "
+            f"hive_partitioning = true, hive_types = {{'season': 'smallint'}})")
+
+
+# SQL table function reading one partition as it is stored (without the season column)
+def partition_sql(directory, year):
+    return f'read_parquet({_quote(partition_path(directory, year))}, hive_partitioning = false)'
+
+
+# Replace one season's partition with the rows of a query (which may include a season column; it is dropped)
+def write_partition(con, directory, year, sql, params=None):
+    path = partition_path(directory, year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}_{threading.get_ident()}.tmp'
+    try:
+        con.execute(f"copy (select * exclude (season) from ({sql})) to {_quote(tmp)} (format parquet, compression zstd)", params)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# Write a kickoff fact table held in memory as a dataset, one partition per season
+def write_dataset(kickoff_facts, directory):
+    con = duckdb.connect()
+    try:
+        con.register('kickoff_facts', kickoff_facts)
+        for year in sorted(kickoff_facts['season'].unique()):
+            write_partition(con, directory, year, 'select * from kickoff_facts where season = ?', [int(year)])
+    finally:
+        con.close()
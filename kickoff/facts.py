@@ -0,0 +1,99 @@
+import duckdb  # Used to write SQL inside Python script
+
+# Enriched kickoff fact table: one row per kickoff with every derived column computed up front.
+# Nothing in here depends on the dashboard filters, so it is built once per data refresh and each
+# filter change only has to apply the filter predicates to the finished table
+KICKOFF_FACTS_SQL = """
+                         select a.season,
+                                a.game_id,
+                                a.drive,
+                                a.series,
+                                a.series_result,
+                                a.fixed_drive_result,
+                                a.desc,
+                                a.weather,
+                                a.roof,
+                                a.surface,
+                                a.temp,
+                                a.wind,
+                                a.kicker_player_id,
+                                a.kickoff_returner_player_id,
+                                a.defteam as kicking_team,
+                                c.team_name as kicking_team_name,
+                                a.return_team,
+                                b.team_name as return_team_name,
+                                case
+                                  when a.posteam_type='home' then 'Home'
+                                  when a.posteam_type='away' then 'Away'
+                                end as return_team_location,
+                                'https://a.espncdn.com/combiner/i?img=/i/teamlogos/nfl/500/' || a.return_team || '.png&h=200&w=200' as team_logo_espn,
+                                a.end_yard_line,
+                                a.kickoff_inside_twenty,
+                                a.kickoff_in_endzone,
+                                a.kickoff_out_of_bounds,
+                                a.kickoff_downed,
+                                a.kickoff_fair_catch,
+                                a.kick_distance,
+                                case
+                                  when lower(a.desc) like '%injur%' then 1 else 0
+                                end as injury,
+                                a.fumble_lost,
+                                a.drive_start_yard_line,
+                                a.touchdown,
+                                -- Yard line is "<team> <yards>"; match the team as a prefix so LA never matches an LAC yard line
+                                case
+                                  when touchdown=1 then 100
+                                  when a.drive_start_yard_line not like return_team || ' %' then 50 + (50 - cast(replace(a.drive_start_yard_line,defteam||' ','') as float))
+                                  else cast(replace(a.drive_start_yard_line,return_team||' ','') as float)
+                                end as yardline_100,
+                                case
+                                  when d.player_id is not null then 1 else 0
+                                end as solo_tackle_by_kicker,
+                                a.penalty_team,
+                                case
+                                  when a.return_team=a.penalty_team and a.penalty=1 then 'Receiving Team'
+                                  when a.return_team<>a.penalty_team and a.penalty=1 then 'Kicking Team'
+                                end as penalty_by_team,
+                                a.penalty,
+                                a.penalty_player_id,
+                                a.penalty_type,
+                                coalesce(a.penalty_yards,0) as penalty_yards,
+                                -- First kickoff drive of each half, over all kickoffs of the game (not only the filtered ones)
+                                case
+                                  when a.drive=min(a.drive) over(partition by a.season,a.game_id,a.game_half) then 1
+                                  else 0
+                                end as first_drive_flag,
+                                case
+                                  when a.desc like '%onside%' then 1 else 0
+                                end as onside_kick,
+                                case
+                                  when a.desc like '%onside%' and own_kickoff_recovery=1 then 1
+                                  else 0
+                                end as onside_kick_successful,
+                                game_seconds_remaining,
+                                half_seconds_remaining
+
+                         from df_game_log a inner join
+                              team_names b on a.return_team = b.team_abbr inner join
+                              team_names c on a.defteam = c.team_abbr left join
+                              kickers d on a.solo_tackle_1_player_id=d.player_id and
+                                           a.season = d.season
+
+                         where a.play_type='kickoff' and
+                               a.play_deleted=0 and
+                               a.return_team is not null
+                         """
+
+
+# Build the kickoff fact table from the game logs and the kicker and team name lookups (see kickoff.reference)
+def build_kickoff_facts(df_game_log, kickers, team_names):
+    con = duckdb.connect()
+    try:
+        # Register the source frames under the names used in the query
+        con.register('df_game_log', df_game_log)
+        con.register('kickers', kickers)
+        con.register('team_names', team_names)
+        return con.execute(KICKOFF_FACTS_SQL).df()
+    finally:
+        con.close()
+
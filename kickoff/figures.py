@@ -0,0 +1,294 @@
+import plotly.graph_objects as go  # Used to create Python visualizations
+
+from kickoff.bootstrap import LEVEL
+
+# Styling of the confidence interval whiskers (thin and grey, so they don't compete with the data)
+ERROR_STYLE = dict(color='#888888', thickness=1, width=3)
+
+
+# Error bars from a measure's <measure>_low/_high columns (kickoff/bootstrap.py), or None when the summary
+# comes without intervals. Groups without an interval get no whisker
+def _error_bars(df, measure):
+    if f'{measure}_low' not in df.columns:
+        return None
+    value = df[measure].astype(float)
+    return dict(
+        type='data',
+        symmetric=False,
+        array=(df[f'{measure}_high'].astype(float) - value).clip(lower=0).fillna(0).to_list(),
+        arrayminus=(value - df[f'{measure}_low'].astype(float)).clip(lower=0).fillna(0).to_list(),
+        **ERROR_STYLE
+    )
+
+
+# Hover text of a measure's interval per row, e.g. " (95% CI 31.2% to 36.8%)", empty where there is none
+def _interval_text(df, measure, number_format):
+    if f'{measure}_low' not in df.columns:
+        return [''] * len(df)
+    return [f' ({LEVEL:.0%} CI {low:{number_format}} to {high:{number_format}})' if low == low and high == high else ''
+            for low, high in zip(df[f'{measure}_low'].astype(float), df[f'{measure}_high'].astype(float))]
+
+
+# The hand-picked axis range when every value of the measures (and their intervals) fits in it, otherwise None so
+# Plotly fits the axis to the data: the ranges were picked for recent seasons, and older seasons (more returns,
+# fewer touchbacks) fall outside them
+def _axis_range(df, measures, fixed):
+    columns = [column for measure in measures for column in (measure, f'{measure}_low', f'{measure}_high') if column in df.columns]
+    values = df[columns].astype(float).stack()
+    if values.empty or (values.min() >= fixed[0] and values.max() <= fixed[1]):
+        return fixed
+    return None
+
+
+# Team scatter plot: scoring rate on drives following kickoffs against average starting field position,
+# with each team drawn as its logo. logo_uris holds one image source per row of kickoffs_team_agg
+# (data URIs from kickoff.logos.LogoStore, so the browser has nothing to download)
+def team_scatter(kickoffs_team_agg, logo_uris):
+
+    # Define values that will map to the x axis, y axis, and team logos
+    y = kickoffs_team_agg['avg_starting_position'].to_list()
+    x = kickoffs_team_agg['scoring_rate_on_drives_following_kickoffs'].to_list()
+
+    # Create a basic scatter plot
+    fig = go.Figure()
+
+    # Add scatter points with invisible markers (we'll replace them with images). When the summary has
+    # confidence intervals, they are drawn as whiskers on both axes and listed in the hover text
+    fig.add_trace(go.Scatter(
+        x=x, # Map 'x' data set to x axis
+        y=y, # Map 'y' data set to y axis
+        mode='markers',
+        marker=dict(opacity=0),  # Make markers invisible
+        error_x=_error_bars(kickoffs_team_agg, 'scoring_rate_on_drives_following_kickoffs'),
+        error_y=_error_bars(kickoffs_team_agg, 'avg_starting_position'),
+        customdata=list(zip(kickoffs_team_agg['return_team_name'],
+                            _interval_text(kickoffs_team_agg, 'scoring_rate_on_drives_following_kickoffs', '.1%'),
+                            _interval_text(kickoffs_team_agg, 'avg_starting_position', '.1f'))),
+        hovertemplate='<b>%{customdata[0]}</b><br>Scoring rate: %{x:.1%}%{customdata[1]}'
+                      '<br>Avg. starting position: %{y:.1f}%{customdata[2]}<extra></extra>'
+    ))
+
+    # Calculate the range of your x and y data (no teams left after filtering: an empty chart)
+    x_range = max(x) - min(x) if x else 0
+    y_range = max(y) - min(y) if y else 0
+
+    # Define the size factor based on the data range to dynamically size logos
+    size_factor_x = x_range * .1
+    size_factor_y = y_range * .1
+
+    # One image per team. They are set on the layout in one go, which is much cheaper than adding them one at a time
+    images = [
+        dict(
+            source=source, # Data URI of the team logo
+            xref="x", # Determines which axis the x position of the image is relative to. When set to "x", the x coordinate of the image is relative to the x-axis of the plot.
+            yref="y", # Determines which axis the y position of the image is relative to. When set to "y", the y coordinate of the image is relative to the y-axis of the plot.
+            x=x[i],  # x position of the image
+            y=y[i],  # y position of the image
+            sizex=size_factor_x,  # Dynamically size to ensure stability as the scale changes
+            sizey=size_factor_y, # Dynamically size to ensure stability as the scale changes
+            xanchor="center", # Adjust the alignment of the image as needed for the x-axis
+            yanchor="middle" # Adjust the alignment of the image as needed for the y-axis
+        )
+        for i, source in enumerate(logo_uris)
+    ]
+
+    # Customize layout
+    fig.update_layout(
+        images=images,
+        title="Scoring Rate by Average Starting Field Position", # Assign visual title
+        xaxis_title="Scoring Rate on Drives Following Kickoffs", # Assign x-axis title
+        yaxis_title="Average Starting Field Position", # Assign y-axis title
+        height=600,  # Set the height of the chart
+        xaxis=dict( # Apply data formatting to the x-axis (rounded to 1 decimal)
+            showgrid=True,
+            tickformat='.1%'  # Format x-axis labels to one decimal place
+        ),
+        yaxis=dict( # Apply data formatting to the y-axis (rounded to 1 decimal)
+            showgrid=True,
+            tickformat='.1f'
+        )
+    )
+
+    return fig
+
+
+# Season combo chart: return rate and scoring rate bars with the average starting field position on a
+# second axis, and the 55% return rate target
+def season_combo(kickoffs_agg):
+
+    # Sort by season to avoid out-of-order connections
+    kickoffs_agg = kickoffs_agg.sort_values('season')
+
+    # Define values for the bars and line graph
+    season = kickoffs_agg['season']
+    return_rate = kickoffs_agg['return_rate']
+    scoring_rate = kickoffs_agg['scoring_rate_on_drives_following_kickoffs']
+    avg_starting_field_position = kickoffs_agg['avg_starting_position_returns']
+
+    # Create a Plotly figure
+    fig = go.Figure()
+
+    # Add grouped bars for Return Rate and Scoring Rate (with confidence interval whiskers when the summary has them)
+    fig.add_trace(go.Bar(x=season, y=return_rate, name='Return Rate', yaxis='y1', marker_color='#660066',
+                         error_y=_error_bars(kickoffs_agg, 'return_rate'),
+                         customdata=_interval_text(kickoffs_agg, 'return_rate', '.1%'),
+                         hovertemplate='%{y:.1%}%{customdata}'))
+    fig.add_trace(go.Bar(x=season, y=scoring_rate, name='Scoring Rate', yaxis='y1', marker_color='#CC99CC',
+                         error_y=_error_bars(kickoffs_agg, 'scoring_rate_on_drives_following_kickoffs'),
+                         customdata=_interval_text(kickoffs_agg, 'scoring_rate_on_drives_following_kickoffs', '.1%'),
+                         hovertemplate='%{y:.1%}%{customdata}'))
+
+    # Add line for Average Starting Field Position (on secondary y-axis)
+    fig.add_trace(go.Scatter(x=season, y=avg_starting_field_position, mode='lines+markers', name='Avg. Starting Field Position', yaxis='y2', marker_color='#999999',
+                             error_y=_error_bars(kickoffs_agg, 'avg_starting_position_returns'),
+                             customdata=_interval_text(kickoffs_agg, 'avg_starting_position_returns', '.1f'),
+                             hovertemplate='%{y:.1f}%{customdata}'))
+
+    # Add a target line for Return Rate at 50% (dotted line)
+    fig.add_trace(go.Scatter(
+        x=season, # Assign the season data set to the x axis
+        y=[0.55] * len(season),  # Constant 55% target line
+        mode='lines', # NO "MARKERS" because we don't need data points like the "Average Starting Field Position" line
+        name='Target Return Rate (55%)', # Target line graph label
+        line=dict(dash='dot', color='black'),  # Set line to be dotted and red
+        yaxis='y1'  # Attach this line to the primary y-axis (Return Rate)
+    ))
+
+    # Update layout for better formatting, including secondary y-axis
+    fig.update_layout(
+        title="Return Rate, Scoring Rate, and Avgerage Starting Field Position by Season",
+        xaxis_title='Season',
+        yaxis=dict(
+            title='Return/Scoring Rate (%)',
+            tickformat=',.1%',  # Format y1-axis as percentage
+            side='left', # Identifies which side of the graph to label the y axis
+            range=_axis_range(kickoffs_agg, ['return_rate', 'scoring_rate_on_drives_following_kickoffs'], [.2,.6]) # Fixed range of values (I liked the fixed axis), automatic when a season falls outside it
+        ),
+        yaxis2=dict(
+            title='Avg. Starting Field Position (Yard Line)',
+            overlaying='y',  # Overlay y2 on the same plot
+            side='right',  # Position y2 on the right side
+            showgrid=False,  # Disable grid lines for y2 to avoid clutter
+            range=_axis_range(kickoffs_agg, ['avg_starting_position_returns'], [20,40])
+        ),
+        barmode='group',  # Group the bars side by side
+        legend=dict(
+            orientation="h",  # Horizontal layout for the legend
+            yanchor="top",  # Align the top of the legend
+            y=-0.2,  # Push the legend below the chart
+            xanchor="center",  # Center the legend
+            x=0.5  # Center the legend horizontally
+        ),
+        plot_bgcolor='white', # Sets the background color of the visual to white
+        hovermode='x unified',  # Show hover info across all bars/lines at the same x value
+    )
+
+    return fig
+
+
+# Touchdown and field goal rates on drives following kickoffs, by season
+def scoring_breakdown(kickoffs_agg):
+
+    # Sort by season to avoid out-of-order x axis
+    kickoffs_agg = kickoffs_agg.sort_values('season')
+
+    # Define values for the bars and line graph
+    season = kickoffs_agg['season']
+    td_rate = kickoffs_agg['td_rate_on_drives_following_kickoffs']
+    fg_rate = kickoffs_agg['fg_rate_on_drives_following_kickoffs']
+
+    # Create a Plotly figure
+    fig = go.Figure()
+
+    # Add grouped bars for Return Rate and Scoring Rate
+    fig.add_trace(go.Scatter(x=season, y=td_rate, name='Touchdown Rate Following Kickoffs', yaxis='y1', marker_color='#660066'))
+    fig.add_trace(go.Scatter(x=season, y=fg_rate, name='Field Goal Rate Following Kickoffs', yaxis='y1', marker_color='#CC99CC'))
+
+    # Update layout for better formatting, including secondary y-axis
+    fig.update_layout(
+        title="Touchdown and Field Goal Scoring Rates on Drives Following Kickoffs", # Graph title
+        xaxis_title='Season', # x axis title
+        yaxis=dict(
+            title='Return/Scoring Rate (%)', # y axis title
+            tickformat=',.1%',  # Format y1-axis as percentage
+            side='left'
+        ),
+        legend=dict(
+            orientation="h",  # Horizontal layout for the legend
+            yanchor="top",  # Align the top of the legend
+            y=-0.2,  # Push the legend below the chart
+            xanchor="center",  # Center the legend
+            x=0.5  # Center the legend horizontally
+        ),
+        plot_bgcolor='white',
+        hovermode='x unified',  # Show hover info across all bars/lines at the same x value
+    )
+
+    return fig
+
+
+# Penalty rate by penalty type, one panel per season
+def penalty_distribution(penalty_agg):
+    import pandas as pd  # Data manipulation and analysis
+    import plotly.express as px # Used to create Python visualizations (only needed for this chart)
+
+    # Aggregate the penalty rate by penalty_type across all seasons
+    penalty_order = penalty_agg.groupby('penalty_type')['penalty_rate'].sum().sort_values(ascending=False).index
+
+    # Convert 'penalty_type' to a categorical type based on the penalty order
+    penalty_agg = penalty_agg.assign(penalty_type=pd.Categorical(penalty_agg['penalty_type'], categories=penalty_order, ordered=True))
+
+    # Ensure the seasons are sorted in chronological order (assuming 'season' is numerical or categorical)
+    penalty_agg = penalty_agg.sort_values(by=['season', 'penalty_type'], ascending=[True, True])
+
+    # Create the horizontal bar chart
+    fig = px.bar(
+        penalty_agg,
+        x='penalty_rate', # The x-axis will reflect the penalty rate
+        y='penalty_type',  # The y-axis will now reflect the sorted penalty types
+        facet_col='season',  # Keep season sorting as per original
+        orientation='h', # set bars to horizontal bars instead of traditional vertical ones
+        title='Penalty Distribution by Year', # Graph title
+        labels={'penalty_rate': 'Penalty Rate', 'penalty_type': 'Penalty Type'} # Assign axis labels to data sets
+    )
+
+    # Update layout for better formatting and outer borders
+    fig.update_layout(
+        height=800, # fixed height
+        showlegend=False, # Hide legend
+        plot_bgcolor='white', # Set background to white
+        title_x=0.5, # centers title along axis
+        title_pad=dict(t=60), # creates some white space between the header and graph
+        margin=dict(l=40, r=40, t=80, b=40), # additional padding options around margins
+    )
+
+    # Customize x-axis to show separators between groups (SEASONS) dynamically
+    fig.for_each_xaxis(lambda xaxis: xaxis.update(
+        showgrid=False, # hide grids
+        showline=True, # display verticle grid line separating years along x axis
+        linewidth=.5, # makes verticle grid line thin
+        linecolor='#e0e0e0', # makes verticle grid line very light grey
+        ticks="",  # Completely remove tick marks
+        # Hide tick marks and data labels along x axis
+        showticksuffix=None,
+        tickmode=None,
+        showticklabels=False,
+        title=None,
+        tickformat='.1%' # format data values if the x axis were to display data labels
+    ))
+
+    # Customize y-axis to show only outer borders (may not neeed this line of code)
+    fig.for_each_yaxis(lambda yaxis: yaxis.update(
+        showgrid=False,
+        showline=True,
+        linewidth=.5, 
+        linecolor='#e0e0e0'
+    ))
+
+    # Update bar color to #660066
+    fig.update_traces(
+        marker_color='#660066',
+        hovertemplate='%{y}: %{x:.1%}<extra></extra>'  # Format hovertemplate to show percentage with one decimal
+    )
+
+    return fig
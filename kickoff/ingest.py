@@ -0,0 +1,25 @@
+import duckdb  # Used to write SQL inside Python script
+
+from kickoff.schema import KICKOFF_SCHEMA, READ_TYPES, enforce_schema
+
+# Columns that have relevance to kickoffs, and their compact types (see kickoff/schema.py).
+# Everything else in the play-by-play files is dropped
+RETAINED_COLUMNS = list(KICKOFF_SCHEMA)
+
+
+# Read one play_by_play_{year}.csv.gz file and keep only the kickoff plays and retained columns.
+# DuckDB streams the file, parses only the retained columns (everything else stays unconverted text)
+# and applies the kickoff filter during the scan, so the ~370 column season never exists in memory.
+# DuckDB releases the GIL while it reads, so several seasons can be parsed at once from a thread pool;
+# pass a cursor of a shared connection to bound the total number of parser threads.
+# Columns are parsed straight to narrow types (declared up front, so the reader never guesses) and the
+# result is converted to the compact schema
+def parse_season(path, connection=None):
+    con = connection if connection is not None else duckdb.connect()
+    columns = ', '.join(f'"{column}"' for column in RETAINED_COLUMNS)
+
+    df = con.execute(f"""select {columns}
+                       from read_csv(?, header=true, compression='gzip', all_varchar=true, types=?,
+                                     nullstr=['NA', ''], sample_size=2048)
+                       where play_type = 'kickoff'""", [path, READ_TYPES]).df()
+    return enforce_schema(df)
@@ -0,0 +1,264 @@
+import collections
+import json
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Lightweight per-stage instrumentation of the dashboard. Each script run (rerun) of a session records the stages
+# it went through (season download/parse, reference lookups, the kickoff fact table, the summaries, each chart)
+# with wall time, CPU time, rows in and out and how far the process memory peaked above where it was when the
+# stage started. A finished rerun is logged as one JSON line and kept in the session's history for the debug panel.
+#
+# Stages are attached to the rerun running on the current thread, so code inside cached functions can record
+# stages without being handed anything; functions run on a thread pool are wrapped with bind() to record theirs
+# in the rerun that submitted them. Outside a rerun (or with instrumentation off) a stage records nothing.
+# CPU time and peak memory are process-wide, so with several sessions running at once they are approximate
+
+# Set by enable(); when off, stage() hands out a shared no-op stage and nothing is measured
+_enabled = True
+_current = threading.local()
+
+
+def enable(on):
+    global _enabled
+    _enabled = on
+
+
+# Resident and peak resident memory (kB) from /proc; the peak is reset by writing 5 to clear_refs.
+# Both are Linux only; elsewhere peak memory is not reported
+def memory_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def reset_peak():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Stage:
+
+    def __init__(self, rerun, name, rows_in):
+        self.rerun = rerun
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.peak_kb = 0  # highest peak seen by stages nested in this one (their resets hide it from this stage)
+
+    def __enter__(self):
+        stack = self.rerun.stack
+        if stack and self.rerun.can_reset:
+            stack[-1].peak_kb = max(stack[-1].peak_kb, memory_kb('VmHWM:') or 0)
+        stack.append(self)
+        self.can_reset = self.rerun.can_reset = self.rerun.can_reset and reset_peak()
+        self.rss_kb = memory_kb('VmRSS:') if self.can_reset else None
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = self.rerun.stack
+        stack.pop()
+        peak_mb = None
+        if self.can_reset:
+            peak_kb = max(memory_kb('VmHWM:') or 0, self.peak_kb)
+            peak_mb = round(max(peak_kb - self.rss_kb, 0) / 1024, 1)
+            if stack:
+                stack[-1].peak_kb = max(stack[-1].peak_kb, peak_kb)
+        self.rerun.stages.append({'stage': self.name, 'wall_ms': round(wall * 1000, 2), 'cpu_ms': round(cpu * 1000, 2),
+                                  'rows_in': self.rows_in, 'rows_out': self.rows_out, 'peak_mb': peak_mb,
+                                  'depth': len(stack)})
+        return False
+
+
+# Stand-in when nothing is recorded: entering and leaving it does no work
+class _NoStage:
+
+    rows_in = rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+# Stage entered on a worker thread bound to a rerun (see bind()). Peak memory is process-wide and the rerun's
+# thread may be resetting it, so only wall time and the worker thread's CPU time are measured; the stage is
+# recorded one level down, as part of the stage the rerun is in
+class _WorkerStage:
+
+    def __init__(self, rerun, name, rows_in):
+        self.rerun = rerun
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall_ms = (time.perf_counter() - self.wall) * 1000
+        cpu_ms = (time.thread_time() - self.cpu) * 1000
+        self.rerun.stages.append({'stage': self.name, 'wall_ms': round(wall_ms, 2), 'cpu_ms': round(cpu_ms, 2),
+                                  'rows_in': self.rows_in, 'rows_out': self.rows_out, 'peak_mb': None,
+                                  'depth': len(self.rerun.stack) + 1})
+        return False
+
+
+class Rerun:
+
+    def __init__(self, session, number):
+        self.session = session
+        self.number = number
+        self.started_at = time.time()
+        self.wall = time.perf_counter()
+        self.stages = []
+        self.stack = []
+        self.can_reset = True
+
+    def finish(self):
+        if getattr(_current, 'rerun', None) is self:
+            _current.rerun = None
+        record = {'event': 'rerun', 'session': self.session.session_id, 'rerun': self.number,
+                  'started_at': round(self.started_at, 3), 'wall_ms': round((time.perf_counter() - self.wall) * 1000, 2),
+                  'stages': self.stages, 'cache': cache_counts()}
+        self.session.add(record)
+        logger.info(json.dumps(record))
+        return record
+
+
+class _NoRerun:
+
+    def finish(self):
+        return None
+
+
+# Record a stage of the rerun running on this thread:
+#
+#   with instrument.stage('kickoff_facts', rows_in=len(game_logs)) as s:
+#       kickoff_facts = build_kickoff_facts(...)
+#       s.rows_out = len(kickoff_facts)
+def stage(name, rows_in=None):
+    if not _enabled:
+        return _NO_STAGE
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is not None:
+        return Stage(rerun, name, rows_in)
+    worker = getattr(_current, 'worker', None)
+    if worker is not None:
+        return _WorkerStage(worker, name, rows_in)
+    return _NO_STAGE
+
+
+# Wrap a function handed to a thread pool so the stages it enters on the worker thread are recorded in the
+# rerun running on this thread (e.g. each season's download and parse while the seasons load concurrently)
+def bind(function):
+    rerun = getattr(_current, 'rerun', None) if _enabled else None
+    if rerun is None:
+        return function
+
+    def bound(*args, **kwargs):
+        _current.worker = rerun
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _current.worker = None
+    return bound
+
+
+# Add a stage measured elsewhere (e.g. on a worker thread, which has no rerun of its own) to the rerun running
+# on this thread. It is recorded one level down, as part of the stage it is added in
+def record(name, wall_ms, cpu_ms, rows_in=None, rows_out=None):
+    rerun = getattr(_current, 'rerun', None) if _enabled else None
+    if rerun is not None:
+        rerun.stages.append({'stage': name, 'wall_ms': round(wall_ms, 2), 'cpu_ms': round(cpu_ms, 2), 'rows_in': rows_in,
+                             'rows_out': rows_out, 'peak_mb': None, 'depth': len(rerun.stack) + 1})
+
+
+# One browser session: the last `history` reruns and running totals per stage
+class Session:
+
+    def __init__(self, history=20):
+        self.session_id = f'{id(self):x}'
+        self.reruns = collections.deque(maxlen=history)
+        self.totals = {}
+        self.count = 0
+
+    def start(self):
+        if not _enabled:
+            return _NoRerun()
+        self.count += 1
+        _current.rerun = Rerun(self, self.count)
+        return _current.rerun
+
+    def add(self, record):
+        self.reruns.append(record)
+        for row in record['stages']:
+            total = self.totals.setdefault(row['stage'], {'stage': row['stage'], 'runs': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0})
+            total['runs'] += 1
+            total['wall_ms'] = round(total['wall_ms'] + row['wall_ms'], 2)
+            total['cpu_ms'] = round(total['cpu_ms'] + row['cpu_ms'], 2)
+
+
+# Process-wide call and miss counts of cached functions. Calls are counted by the cache_calls wrapper around the
+# cached function, misses by cache_miss() at the top of its body (the body only runs when the cache misses).
+# Caches of their own (the season cache, the chart sections) call cache_call() and cache_miss() directly
+_cache_lock = threading.Lock()
+_cache_counts = {}
+
+
+def cache_calls(name):
+    def decorate(cached):
+        def wrapper(*args, **kwargs):
+            cache_call(name)
+            return cached(*args, **kwargs)
+        wrapper.__wrapped__ = cached
+        wrapper.clear = getattr(cached, 'clear', None)
+        return wrapper
+    return decorate
+
+
+def cache_call(name):
+    with _cache_lock:
+        _cache_counts.setdefault(name, [0, 0])[0] += 1
+
+
+def cache_miss(name):
+    with _cache_lock:
+        _cache_counts.setdefault(name, [0, 0])[1] += 1
+
+
+def cache_counts():
+    with _cache_lock:
+        return {name: {'calls': calls, 'hits': calls - misses, 'misses': misses}
+                for name, (calls, misses) in _cache_counts.items()}
+
+
+# Instrumentation records are INFO messages of this module's logger; unless the app configures logging itself,
+# send them to stderr so they show up next to Streamlit's own output
+def setup_logging(level=logging.INFO):
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(level)
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw  # Resize logos and draw placeholders
+
+logger = logging.getLogger(__name__)
+
+# Team logos are drawn about 60 pixels wide on the team scatter plot; keep them at that size
+LOGO_SIZE = 64
+
+
+# Local store of team logos, embedded in the chart as data URIs so browsers never fetch them from ESPN.
+# Each logo is downloaded once, shrunk to LOGO_SIZE and kept as a small PNG in the directory.
+# When a logo cannot be downloaded (offline) a placeholder with the team abbreviation is used instead;
+# placeholders are not written to disk, so the real logo is tried again the next time the store is created.
+# A store with fetch=False only reads the directory (e.g. the logos of a precompute run): it never downloads
+# or writes anything, and logos missing from it are placeholders
+class LogoStore:
+
+    def __init__(self, directory, size=LOGO_SIZE, timeout=5, fetch=True):
+        self.directory = directory
+        self.size = size
+        self.timeout = timeout
+        self.fetch = fetch
+        self.uris = {}
+        self.lock = threading.Lock()
+        if fetch:
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest()[:16] + '.png')
+
+    # Data URIs for several logo URLs, in the same order. Missing logos are fetched concurrently
+    def data_uris(self, urls, workers=8):
+        urls = list(urls)
+        with self.lock:
+            missing = list(dict.fromkeys(url for url in urls if url not in self.uris))
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as pool:
+                fetched = dict(zip(missing, pool.map(self._load, missing)))
+            with self.lock:
+                self.uris.update(fetched)
+        return [self.uris[url] for url in urls]
+
+    # Data URI of one logo: from disk, else downloaded and resized, else a placeholder
+    def _load(self, url):
+        path = self.path(url)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return _data_uri(f.read())
+        if not self.fetch:
+            return _data_uri(_placeholder(_team_label(url), self.size))
+
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                png = _resize(response.read(), self.size)
+        except (OSError, Image.UnidentifiedImageError):
+            logger.warning('Could not fetch logo %s, using a placeholder', url)
+            return _data_uri(_placeholder(_team_label(url), self.size))
+
+        # Write to a temporary file and rename it into place so a half-written logo is never read
+        tmp = f'{path}.{os.getpid()}_{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(png)
+        os.replace(tmp, path)
+        return _data_uri(png)
+
+
+def _data_uri(png):
+    return 'data:image/png;base64,' + base64.b64encode(png).decode('ascii')
+
+
+# Shrink an image to fit size x size pixels and return it as PNG bytes
+def _resize(image_bytes, size):
+    image = Image.open(io.BytesIO(image_bytes)).convert('RGBA')
+    image.thumbnail((size, size), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+# Team abbreviation from an ESPN logo URL (.../combiner/i?img=/i/teamlogos/nfl/500/KC.png&h=200&w=200)
+def _team_label(url):
+    parsed = urllib.parse.urlparse(url)
+    image_path = urllib.parse.parse_qs(parsed.query).get('img', [parsed.path])[0]
+    return os.path.splitext(os.path.basename(image_path))[0].upper() or '?'
+
+
+# Grey disc with the team abbreviation, as PNG bytes
+def _placeholder(label, size):
+    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((1, 1, size - 2, size - 2), fill=(120, 120, 120, 255))
+    draw.text((size / 2, size / 2), label, fill=(255, 255, 255, 255), anchor='mm')
+    out = io.BytesIO()
+    image.save(out, format='PNG')
+    return out.getvalue()
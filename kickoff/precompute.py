@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import re
+import shutil
+import time
+
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff.config import CACHE_DIR, FETCH_WORKERS, MEMORY_LIMIT, PARSE_WORKERS, PBP_SOURCE, QUERY_CURSORS, REFERENCE_MAX_AGE
+from kickoff.cube import KickoffCube, cube_cells
+from kickoff.dataset import write_dataset
+from kickoff.facts import build_kickoff_facts
+from kickoff.logos import LogoStore
+from kickoff.queries import KickoffQueries
+from kickoff.reference import ReferenceCache
+from kickoff.schema import concat_seasons
+from kickoff.season_cache import SeasonCache
+from kickoff.sources import make_source
+
+logger = logging.getLogger(__name__)
+
+# Precomputed dashboard artifacts. A run does everything the dashboard would do at request time (ingest,
+# reference data, the kickoff fact table, the filter cube, team logos) and writes the results into a new
+# run directory:
+#
+#   <artifact dir>/<run id>/facts/                kickoff fact table, one partition per season (for the SQL engine)
+#   <artifact dir>/<run id>/season_cells.parquet  cube cells for the season and penalty summaries
+#   <artifact dir>/<run id>/team_cells.parquet    cube cells for the team summary
+#   <artifact dir>/<run id>/logos/                resized team logos (unless run without them)
+#   <artifact dir>/manifest.json                  the published run
+#
+# The manifest is replaced only once a run is complete, so a dashboard reading it always sees a whole run.
+# The last few runs are kept so dashboards still holding an older manifest can finish reading it
+
+# Bumped whenever the layout of the artifacts changes; dashboards refuse artifacts of another version
+ARTIFACT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+KEEP_RUNS = 3
+RUN_ID = re.compile(r'\d{8}T\d{6}_\d+')
+
+
+# The kickoff fact table for the given seasons, loaded the same way the dashboard loads it
+def load_kickoff_facts(years, current_season):
+    season_cache = SeasonCache(CACHE_DIR, make_source(PBP_SOURCE), current_season=current_season)
+    game_logs = concat_seasons(season_cache.load_many(years, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS))
+    kickers, team_names = ReferenceCache(CACHE_DIR, current_season=current_season, max_age=REFERENCE_MAX_AGE).load(years)
+    return build_kickoff_facts(game_logs, kickers, team_names)
+
+
+# Run the whole pipeline once and publish the results as a new run. Returns the manifest
+def precompute(artifact_dir, years, current_season=None, logos=True):
+    years = sorted(years)
+    current_season = current_season or max(years)
+    started = time.time()
+
+    run_id = time.strftime('%Y%m%dT%H%M%S', time.gmtime(started)) + f'_{os.getpid()}'
+    run_dir = os.path.join(artifact_dir, run_id)
+    os.makedirs(run_dir)
+
+    kickoff_facts = load_kickoff_facts(years, current_season)
+    season_cells, team_cells = cube_cells(kickoff_facts)
+
+    # The fact table is written as a season-partitioned dataset (see kickoff/dataset.py), queried in place
+    write_dataset(kickoff_facts, os.path.join(run_dir, 'facts'))
+    files = {'facts': {'path': 'facts', 'rows': len(kickoff_facts),
+                       'bytes': sum(os.path.getsize(os.path.join(directory, name))
+                                    for directory, _, names in os.walk(os.path.join(run_dir, 'facts')) for name in names)}}
+    for name, df in [('season_cells', season_cells), ('team_cells', team_cells)]:
+        file_name = f'{name}.parquet'
+        df.to_parquet(os.path.join(run_dir, file_name), index=False)
+        files[name] = {'path': file_name, 'rows': len(df), 'bytes': os.path.getsize(os.path.join(run_dir, file_name))}
+
+    # Team logos, so a dashboard in artifact mode has nothing to download. They are listed in the manifest only
+    # when written, so a dashboard knows whether to read them or keep its own logo store
+    if logos:
+        logo_store = LogoStore(os.path.join(run_dir, 'logos'))
+        logo_store.data_uris(kickoff_facts['team_logo_espn'].dropna().unique())
+        names = os.listdir(logo_store.directory)
+        files['logos'] = {'path': 'logos', 'rows': len(names),
+                          'bytes': sum(os.path.getsize(os.path.join(logo_store.directory, name)) for name in names)}
+
+    manifest = {
+        'artifact_version': ARTIFACT_VERSION,
+        'run_id': run_id,
+        'created_at': started,
+        'seconds': round(time.time() - started, 3),
+        'seasons': years,
+        'current_season': current_season,
+        'source': PBP_SOURCE,
+        'files': files,
+    }
+
+    # Publish: write the manifest under a temporary name and rename it into place
+    manifest_tmp = os.path.join(artifact_dir, f'.{MANIFEST_NAME}.{os.getpid()}.tmp')
+    with open(manifest_tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, os.path.join(artifact_dir, MANIFEST_NAME))
+    logger.info('Published run %s (%s kickoffs) in %.1f s', run_id, len(kickoff_facts), manifest['seconds'])
+
+    _prune_runs(artifact_dir, run_id)
+    return manifest
+
+
+# Remove all but the KEEP_RUNS newest run directories (run ids sort by time). Anything else in the directory is left alone
+def _prune_runs(artifact_dir, current_run_id):
+    runs = sorted(name for name in os.listdir(artifact_dir)
+                  if RUN_ID.fullmatch(name) and os.path.isdir(os.path.join(artifact_dir, name)) and name != current_run_id)
+    for name in runs[:max(0, len(runs) - (KEEP_RUNS - 1))]:
+        shutil.rmtree(os.path.join(artifact_dir, name), ignore_errors=True)
+
+
+# Manifest of the published run
+def read_manifest(artifact_dir):
+    with open(os.path.join(artifact_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('artifact_version') != ARTIFACT_VERSION:
+        raise ValueError(f"Artifacts in {artifact_dir} are version {manifest.get('artifact_version')}, "
+                         f'expected {ARTIFACT_VERSION}; rerun python -m kickoff precompute')
+    return manifest
+
+
+def run_path(artifact_dir, manifest, *parts):
+    return os.path.join(artifact_dir, manifest['run_id'], *parts)
+
+
+# Summary engine of the published run, read from its files only: the cube from its cells, or the SQL
+# engine querying the fact table dataset in place
+def load_engine(artifact_dir, engine='sql', manifest=None):
+    manifest = manifest or read_manifest(artifact_dir)
+    files = manifest['files']
+    if engine == 'cube':
+        return KickoffCube(pd.read_parquet(run_path(artifact_dir, manifest, files['season_cells']['path'])),
+                           pd.read_parquet(run_path(artifact_dir, manifest, files['team_cells']['path'])))
+    return KickoffQueries(run_path(artifact_dir, manifest, files['facts']['path']), cursors=QUERY_CURSORS, memory_limit=MEMORY_LIMIT)
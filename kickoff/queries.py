@@ -0,0 +1,96 @@
+import contextlib
+import queue
+import threading
+
+import duckdb  # Used to write SQL inside Python script
+
+from kickoff.aggregates import CLUSTER_SQL, INTERVAL_MEASURES, SUMMARY_KEYS, SUMMARY_SQL, split_clusters, split_summaries
+from kickoff.bootstrap import REPLICATES, game_intervals
+from kickoff.dataset import scan_sql
+
+# Query layer for the dashboard. One long-lived DuckDB connection serves the kickoff fact table, either as a
+# native DuckDB table or straight from the season-partitioned Parquet dataset (kickoff/dataset.py), and every
+# query runs against it with the filter pane values bound as parameters.
+# Filter values never become part of the SQL text
+
+# Season range that leaves the kickoffs unfiltered by season
+ALL_SEASONS = (0, 9999)
+
+# Kickoffs matching the filter pane. Summary queries read it as their "kickoffs" data set
+FILTERED_KICKOFFS_SQL = """
+                         select *
+
+                         from kickoff_facts
+
+                         where season BETWEEN $season_from AND $season_to and
+                               game_seconds_remaining/60.0 BETWEEN $game_minutes_from AND $game_minutes_to and
+                               half_seconds_remaining/60.0 BETWEEN $half_minutes_from AND $half_minutes_to and
+                               ($roof_type = 'Select All' or roof = $roof_type) and
+                               ($return_type = 'Select All' or
+                                ($return_type = 'Touchback' and kickoff_returner_player_id is null) or
+                                ($return_type = 'Return' and kickoff_returner_player_id is not null))
+                         """
+
+# Bind the filter pane values to the parameter names used in FILTERED_KICKOFFS_SQL
+def filter_params(minutes_remaining_game, minutes_remaining_half, roof_type, return_type, seasons=ALL_SEASONS):
+    return {
+        'season_from': seasons[0],
+        'season_to': seasons[1],
+        'game_minutes_from': minutes_remaining_game[0],
+        'game_minutes_to': minutes_remaining_game[1],
+        'half_minutes_from': minutes_remaining_half[0],
+        'half_minutes_to': minutes_remaining_half[1],
+        'roof_type': roof_type,
+        'return_type': return_type,
+    }
+
+
+# Holds the process-wide connection. A fact table DataFrame is copied into DuckDB once, so queries scan a native
+# table instead of converting a pandas DataFrame (a replacement scan) on every rerun. A dataset directory is
+# queried in place instead: nothing is loaded up front, the season range prunes the partitions each query opens,
+# and DuckDB keeps within memory_limit (spilling to disk beyond it).
+# A DuckDB connection runs one statement at a time, and Streamlit sessions run on separate threads. Queries
+# therefore run on cursors (connections to the same in-memory database) handed out from a pool: each running
+# query has a cursor to itself, so sessions query the shared table concurrently. Cursors are opened on first
+# need and reused; at most `cursors` queries run at once, further ones wait for a cursor to come back
+class KickoffQueries:
+
+    def __init__(self, kickoff_facts, cursors=8, memory_limit=None):
+        self.con = duckdb.connect(config={'memory_limit': memory_limit} if memory_limit else {})
+        if isinstance(kickoff_facts, str):
+            self.con.execute(f'create view kickoff_facts as select * from {scan_sql(kickoff_facts)}')
+        else:
+            self.con.register('kickoff_facts_frame', kickoff_facts)
+            self.con.execute('create table kickoff_facts as select * from kickoff_facts_frame')
+            self.con.unregister('kickoff_facts_frame')
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, cursors))
+
+    # Borrow a cursor for one query (the most recently used one, or a new one while the pool is not full)
+    @contextlib.contextmanager
+    def cursor(self):
+        with self._slots:
+            try:
+                cursor = self._idle.get_nowait()
+            except queue.Empty:
+                cursor = self.con.cursor()
+            try:
+                yield cursor
+            finally:
+                self._idle.put(cursor)
+
+    # Run one of the summary queries over the filtered kickoffs, with the filter values bound as parameters
+    def run(self, sql, filters):
+        with self.cursor() as cursor:
+            return cursor.execute(f'with kickoffs as ({FILTERED_KICKOFFS_SQL}) {sql}', filters).df()
+
+    # Season, team (latest season) and season x penalty summaries of the filtered kickoffs, from one scan
+    def summaries(self, filters):
+        return split_summaries(self.run(SUMMARY_SQL, filters))
+
+    # Game-clustered bootstrap confidence intervals of the interval measures for the season and team summaries
+    # (see kickoff/bootstrap.py), keyed like the summaries. The per-game totals of both come from one scan
+    def intervals(self, filters, replicates=REPLICATES):
+        return {grain: game_intervals(clusters, SUMMARY_KEYS[grain], INTERVAL_MEASURES, replicates)
+                for grain, clusters in split_clusters(self.run(CLUSTER_SQL, filters)).items()}
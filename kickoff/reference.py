@@ -0,0 +1,96 @@
+import logging
+import os
+import threading
+import time
+
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff import instrument
+
+logger = logging.getLogger(__name__)
+
+# Reference data the kickoff fact table joins to. Of the full rosters only the kickers matter (a kickoff
+# tackled by the kicker), and of the team table only the names. Both are cut down to those columns with
+# compact types, and each has one row per join key so the joins are plain lookups that never duplicate a kickoff
+ROSTER_COLUMNS = ['season', 'player_id', 'position']
+TEAM_COLUMNS = ['team_abbr', 'team_name']
+
+
+# Kicker lookup: one row per (season, player_id) of every player listed as a kicker that season
+def slim_rosters(df_players):
+    kickers = df_players.loc[df_players['position'] == 'K', ['season', 'player_id']].dropna()
+    kickers = kickers.astype({'season': 'int16', 'player_id': 'str'})
+    return kickers.drop_duplicates().sort_values(['season', 'player_id']).reset_index(drop=True)
+
+
+# Team name lookup: one row per team abbreviation
+def slim_teams(df_teams):
+    teams = df_teams[TEAM_COLUMNS].dropna().astype({'team_abbr': 'str', 'team_name': 'str'})
+    return teams.drop_duplicates('team_abbr').sort_values('team_abbr').reset_index(drop=True)
+
+
+# nfl_data_py takes a moment to import, and is only needed when a lookup has to be (re)fetched
+def _fetch_rosters(year):
+    import nfl_data_py as nfl  # Used to import NFL data
+    return nfl.import_seasonal_rosters([year], columns=ROSTER_COLUMNS)
+
+
+def _fetch_teams():
+    import nfl_data_py as nfl  # Used to import NFL data
+    return nfl.import_team_desc()
+
+
+# On-disk cache of the slimmed reference data, stored next to the season cache: one kicker file per season
+# and one team file. Kickers of closed seasons never change, so they are fetched once; the current season's
+# kickers and the team table are refetched once they are older than max_age seconds
+class ReferenceCache:
+
+    def __init__(self, directory, current_season, max_age=86400, fetch_rosters=_fetch_rosters, fetch_teams=_fetch_teams):
+        self.directory = directory
+        self.current_season = current_season
+        self.max_age = max_age
+        self.fetch_rosters = fetch_rosters
+        self.fetch_teams = fetch_teams
+        os.makedirs(directory, exist_ok=True)
+
+    def kickers_path(self, year):
+        return os.path.join(self.directory, f'kickers_{year}.parquet')
+
+    def teams_path(self):
+        return os.path.join(self.directory, 'teams.parquet')
+
+    # Kicker lookup for several seasons and the team name lookup
+    def load(self, years):
+        kickers = pd.concat([self.load_kickers(year) for year in years], ignore_index=True)
+        return kickers, self.load_teams()
+
+    def load_kickers(self, year):
+        return self._load(self.kickers_path(year), year < self.current_season,
+                          lambda: slim_rosters(self.fetch_rosters(year)))
+
+    def load_teams(self):
+        return self._load(self.teams_path(), False, lambda: slim_teams(self.fetch_teams()))
+
+    # Read a cached lookup, fetching it first when it is missing or stale. The fetch is recorded as a stage of
+    # the rerun loading the lookup, named after its file (fetch_kickers_2024, fetch_teams)
+    def _load(self, path, closed, fetch):
+        cached = os.path.exists(path)
+        if cached and (closed or time.time() - os.path.getmtime(path) < self.max_age):
+            return pd.read_parquet(path)
+
+        try:
+            with instrument.stage(f'fetch_{os.path.splitext(os.path.basename(path))[0]}') as stage:
+                df = fetch()
+                stage.rows_out = len(df)
+        except OSError:
+            # Source unreachable: keep serving the last good copy if there is one
+            if not cached:
+                raise
+            logger.warning('Could not refresh %s, serving cached copy', path)
+            return pd.read_parquet(path)
+
+        # Write to a temporary file and rename it into place so readers never see a half-written file
+        tmp = f'{path}.{os.getpid()}_{threading.get_ident()}.tmp'
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return df
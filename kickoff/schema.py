@@ -0,0 +1,84 @@
+import pandas as pd  # Data manipulation and analysis
+
+# Compact in-memory types for the kickoff plays kept from each play-by-play file.
+# The defaults (a Python object per string, float64 for everything numeric) cost most of the memory the
+# cached frame takes, and Streamlit copies that frame on every cache access. Instead:
+#   - strings that repeat across kickoffs (ids, teams, roof, drive results, yard lines) are categoricals,
+#     stored once per distinct value with a small integer code per row
+#   - free text that is unique per kickoff (desc) stays an Arrow-backed string (pandas' default 'str' type
+#     from pandas 3 on, which requirements.txt asks for; on pandas 2 'str' means Python objects)
+#   - 0/1 flags are nullable Int8, whole-number counts and clocks nullable Int16, measurements float32
+# DuckDB scans all of these directly (categoricals arrive as ENUMs) so the SQL needs no casts
+
+CATEGORY = 'category'
+TEXT = 'str'
+FLAG = 'Int8'
+WHOLE = 'Int16'
+MEASURE = 'float32'
+
+# Retained columns, in file order, with their types
+KICKOFF_SCHEMA = {
+    'season': 'int16',
+    'game_id': CATEGORY,
+    'drive': WHOLE,
+    'series': WHOLE,
+    'series_result': CATEGORY,
+    'fixed_drive_result': CATEGORY,
+    'desc': TEXT,
+    'weather': CATEGORY,
+    'roof': CATEGORY,
+    'surface': CATEGORY,
+    'temp': MEASURE,
+    'wind': MEASURE,
+    'kicker_player_id': CATEGORY,
+    'kickoff_returner_player_id': CATEGORY,
+    'penalty': FLAG,
+    'return_team': CATEGORY,
+    'return_yards': WHOLE,
+    'penalty_player_id': CATEGORY,
+    'penalty_type': CATEGORY,
+    'penalty_yards': WHOLE,
+    'end_yard_line': CATEGORY,
+    'kickoff_inside_twenty': FLAG,
+    'kickoff_in_endzone': FLAG,
+    'kickoff_out_of_bounds': FLAG,
+    'kickoff_downed': FLAG,
+    'kickoff_fair_catch': FLAG,
+    'kick_distance': WHOLE,
+    'fumble_lost': FLAG,
+    'drive_start_yard_line': CATEGORY,
+    'touchdown': FLAG,
+    'defteam': CATEGORY,
+    'play_type': CATEGORY,
+    'play_deleted': FLAG,
+    'solo_tackle_1_player_id': CATEGORY,
+    'posteam_type': CATEGORY,
+    'penalty_team': CATEGORY,
+    'game_half': CATEGORY,
+    'own_kickoff_recovery': FLAG,
+    'game_seconds_remaining': WHOLE,
+    'half_seconds_remaining': WHOLE,
+}
+
+# Type the CSV reader parses each column as, before the frame is converted to the types above
+DUCKDB_TYPES = {CATEGORY: 'VARCHAR', TEXT: 'VARCHAR', FLAG: 'TINYINT', WHOLE: 'SMALLINT', MEASURE: 'FLOAT', 'int16': 'SMALLINT'}
+READ_TYPES = {column: DUCKDB_TYPES[dtype] for column, dtype in KICKOFF_SCHEMA.items()}
+
+
+# Convert a frame of kickoff plays to the schema types (columns already of the right type are left alone;
+# dtypes are compared as dtypes, since a type's name is not always the string it was asked for by)
+def enforce_schema(df):
+    changes = {column: dtype for column, dtype in KICKOFF_SCHEMA.items()
+               if column in df.columns and df[column].dtype != dtype}
+    return df.astype(changes) if changes else df
+
+
+# Concatenate per-season frames without losing the categoricals: pandas falls back to plain objects when
+# the categories differ, so every frame first gets the union of all seasons' categories
+def concat_seasons(frames):
+    frames = [enforce_schema(df) for df in frames]
+    for column, dtype in KICKOFF_SCHEMA.items():
+        if dtype == CATEGORY and len(frames) > 1:
+            categories = pd.Index(sorted(set().union(*(df[column].cat.categories for df in frames))))
+            frames = [df.assign(**{column: df[column].cat.set_categories(categories)}) for df in frames]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb  # Used to write SQL inside Python script
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff import instrument
+from kickoff.ingest import parse_season
+from kickoff.schema import enforce_schema
+
+logger = logging.getLogger(__name__)
+
+
+# On-disk cache of each season's kickoff rows. Every season is stored as a Parquet file next to a
+# small JSON file recording where it came from (source, size, ETag, modified time).
+# Seasons before the current season are closed: once cached after they closed they are never fetched again.
+# The current season is revalidated against the source and only re-downloaded when the file changed, and once
+# more after it closes (the metadata records whether the season had closed when it was fetched)
+class SeasonCache:
+
+    def __init__(self, directory, source, current_season):
+        self.directory = directory
+        self.source = source
+        self.current_season = current_season
+        os.makedirs(directory, exist_ok=True)
+
+    def parquet_path(self, year):
+        return os.path.join(self.directory, f'kickoffs_{year}.parquet')
+
+    def meta_path(self, year):
+        return os.path.join(self.directory, f'kickoffs_{year}.json')
+
+    def is_closed(self, year):
+        return year < self.current_season
+
+    # Metadata for a cached season, or None when the season is not cached (or was cached from another source)
+    def read_meta(self, year):
+        try:
+            with open(self.meta_path(year)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('source') != self.source.location or not os.path.exists(self.parquet_path(year)):
+            return None
+        return meta
+
+    # Seasons from first to last that are cached from this source, so they can be served without it
+    def seasons(self, first, last):
+        return [year for year in range(first, last + 1) if self.read_meta(year) is not None]
+
+    # Return the kickoff rows for several seasons, in the order given.
+    # Seasons are revalidated, downloaded and parsed concurrently on a thread pool. Parsing goes through
+    # cursors of one DuckDB connection, whose thread setting bounds the CPU used by all seasons together.
+    # Closed, cached seasons are read straight from Parquet
+    def load_many(self, years, fetch_workers=1, parse_workers=1):
+        years = list(years)
+        parser = duckdb.connect(config={'threads': max(1, parse_workers)})
+
+        try:
+            if fetch_workers > 1 and len(years) > 1:
+                with ThreadPoolExecutor(max_workers=min(fetch_workers, len(years))) as pool:
+                    # map returns results in the order of years, whatever order the seasons finish in
+                    return list(pool.map(instrument.bind(lambda year: self.load(year, parser.cursor())), years))
+            return [self.load(year, parser) for year in years]
+        finally:
+            parser.close()
+
+    # Return the kickoff rows for one season, fetching from the source only when needed. Loads are counted as
+    # calls of 'season_cache' and refetches as its misses (see kickoff/instrument.py), whether the seasons feed
+    # load_game_logs or the warehouse sync
+    def load(self, year, parser=None):
+        instrument.cache_call('season_cache')
+        meta = self.read_meta(year)
+        closed = self.is_closed(year)
+
+        # A season cached after it closed never changes. One cached while it was still being played is
+        # revalidated once more after it closes, so its last games are not left out for good
+        if meta is not None and closed and meta.get('closed'):
+            return self.read(year)
+
+        try:
+            stat = self.source.stat(year)
+        except OSError:
+            # Source unreachable (offline, rate limited): keep serving the last good copy if there is one
+            if meta is None:
+                raise
+            logger.warning('Could not revalidate season %s, serving cached copy', year)
+            return self.read(year)
+
+        if meta is not None and _same_file(meta, stat):
+            if closed and not meta.get('closed'):
+                self.write_meta(year, dict(meta, closed=True))
+            return self.read(year)
+
+        return self.refresh(year, stat, parser)
+
+    # Read a cached season. Parquet keeps the compact types; files cached before they were introduced are converted
+    def read(self, year):
+        return enforce_schema(pd.read_parquet(self.parquet_path(year)))
+
+    # Fetch and parse one season, then replace its cache entry. The download and the parse are recorded as
+    # stages of the rerun loading the season (see kickoff/instrument.py)
+    def refresh(self, year, stat, parser=None):
+        instrument.cache_miss('season_cache')
+
+        # Temporary files are unique per process and thread so concurrent refreshes never share one
+        unique = f'{os.getpid()}_{threading.get_ident()}'
+
+        path = self.source.local_path(year)
+        download_path = None
+        if path is None:
+            download_path = os.path.join(self.directory, f'.download_{year}_{unique}.csv.gz')
+            with instrument.stage(f'download_{year}'):
+                path = self.source.download(year, download_path)
+
+        try:
+            with instrument.stage(f'parse_{year}') as stage:
+                df = parse_season(path, parser)
+                stage.rows_out = len(df)
+        finally:
+            if download_path is not None and os.path.exists(download_path):
+                os.remove(download_path)
+
+        # Write to temporary files and rename them into place so a crash never leaves a half-written season behind
+        parquet_tmp = f'{self.parquet_path(year)}.{unique}.tmp'
+        df.to_parquet(parquet_tmp, index=False)
+        os.replace(parquet_tmp, self.parquet_path(year))
+
+        self.write_meta(year, dict(stat, season=year, source=self.source.location, rows=len(df), fetched_at=time.time(),
+                                   closed=self.is_closed(year)))
+
+        logger.info('Cached season %s (%s kickoffs)', year, len(df))
+        return df
+
+    # Replace a season's metadata file, through a temporary file like the Parquet file
+    def write_meta(self, year, meta):
+        meta_tmp = f'{self.meta_path(year)}.{os.getpid()}_{threading.get_ident()}.tmp'
+        with open(meta_tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, self.meta_path(year))
+
+
+# Compare cached metadata with the source: ETag when both sides have one, otherwise size and modified time
+def _same_file(meta, stat):
+    if meta.get('etag') and stat.get('etag'):
+        return meta['etag'] == stat['etag']
+    return meta.get('size') == stat.get('size') and meta.get('mtime') == stat.get('mtime')
@@ -0,0 +1,106 @@
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kickoff import instrument
+from kickoff.bootstrap import REPLICATES
+from kickoff.queries import filter_params
+
+# Chart sections of the dashboard. Each section declares the summary it shows (a grain of the summary engine)
+# and how its figure is built from it. Every chart on the page is computed from the kickoffs matching all of the
+# filter pane inputs, so the sections are computed together, once per filter state:
+#
+#   - the season, team and penalty summaries come from one pass of the summary engine (a single GROUPING SETS
+#     scan, or one walk over the cube's cells)
+#   - the confidence intervals some sections ask for (kickoff/bootstrap.py) come from one scan of per-game
+#     totals, run next to the summaries on the thread pool. Engines without intervals (the cube) leave them out
+#   - the figures are then built one after another on the calling thread. DuckDB releases the GIL while a query
+#     runs, so the two queries overlap; building a figure mostly holds it, so building them on the pool only
+#     added thread switches (benchmarks/bench_sections.py)
+#
+# Results are kept per filter state, for every session of the process: going back to a filter state already
+# seen reuses its summaries and figures instead of recomputing them. Intervals are joined onto the section's
+# summary as <measure>_low/_high columns before its figure is built, so they are kept along with the figure
+
+Section = collections.namedtuple('Section', ['grain', 'build', 'intervals'], defaults=[False])
+
+
+class SectionRunner:
+
+    def __init__(self, workers=2, max_entries=128, replicates=REPLICATES):
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='kickoff-section')
+        self.max_entries = max_entries
+        self.replicates = replicates
+        self.engine = None
+        self.results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    # Summary and figure of every section for the current filter pane inputs (the arguments of filter_params,
+    # by name), as {name: (summary, figure)}. Results computed for another engine (before a data refresh) are dropped
+    def compute(self, engine, sections, inputs):
+        with self._lock:
+            if engine is not self.engine:
+                self.engine = engine
+                self.results.clear()
+
+        key = (tuple(sections), tuple(sorted(inputs.items())))
+        results = self._cached(key)
+        instrument.cache_call('sections')
+        if results is not None:
+            return results
+        instrument.cache_miss('sections')
+
+        filters = filter_params(**inputs)
+        summaries = self.pool.submit(_timed, engine.summaries, filters)
+        intervals = None
+        if any(section.intervals for section in sections.values()) and self.replicates and hasattr(engine, 'intervals'):
+            intervals = self.pool.submit(_timed, engine.intervals, filters, self.replicates)
+
+        summary, wall_ms, cpu_ms = summaries.result()
+        instrument.record('summaries', wall_ms, cpu_ms, rows_out=sum(len(frame) for frame in summary.values()))
+        if intervals is not None:
+            interval, wall_ms, cpu_ms = intervals.result()
+            instrument.record('intervals', wall_ms, cpu_ms, rows_out=sum(len(frame) for frame in interval.values()))
+
+        # Each figure is built from its section's summary, with the intervals joined on when it asks for them
+        results = {}
+        for name, section in sections.items():
+            frame = summary[section.grain]
+            if section.intervals and intervals is not None:
+                frame = _join_intervals(frame, interval[section.grain])
+            figure, wall_ms, cpu_ms = _timed(section.build, frame)
+            instrument.record(f'figure_{name}', wall_ms, cpu_ms)
+            results[name] = (frame, figure)
+        self._store(engine, key, results)
+        return results
+
+    def _cached(self, key):
+        with self._lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key]
+        return None
+
+    def _store(self, engine, key, result):
+        with self._lock:
+            if engine is not self.engine:
+                return
+            self.results[key] = result
+            while len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+
+
+# Call function(*args), timing wall and CPU time of the thread it runs on
+def _timed(function, *args):
+    wall, cpu = time.perf_counter(), time.thread_time()
+    result = function(*args)
+    return result, (time.perf_counter() - wall) * 1000, (time.thread_time() - cpu) * 1000
+
+
+# Summary with the <measure>_low/_high columns of its intervals (missing for groups without any)
+def _join_intervals(summary, intervals):
+    keys = [column for column in intervals.columns if column in summary.columns]
+    if not len(summary) or not len(intervals):
+        return summary.reindex(columns=[*summary.columns, *(column for column in intervals.columns if column not in keys)])
+    return summary.merge(intervals, how='left', on=keys)
@@ -0,0 +1,126 @@
+import os
+import re
+import shutil
+import urllib.error
+import urllib.parse
+import urllib.request
+from email.utils import parsedate_to_datetime
+
+# File name used by nflverse for each season of play-by-play data
+PBP_FILE_NAME = 'play_by_play_{year}.csv.gz'
+PBP_FILE_PATTERN = re.compile(r'play_by_play_(\d{4})\.csv\.gz')
+
+
+# urllib turns a redirected HEAD request into a GET (GitHub release downloads always redirect),
+# which would start downloading the whole file just to read its headers. Keep the original method instead
+class _KeepMethodRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        new_request = super().redirect_request(req, fp, code, msg, headers, newurl)
+        if new_request is not None:
+            new_request.method = req.get_method()
+        return new_request
+
+
+_opener = urllib.request.build_opener(_KeepMethodRedirectHandler)
+
+
+# Season files served over HTTP(S), e.g. the nflverse GitHub releases
+class HttpSource:
+
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    # Identifies the source in the cache metadata so switching sources invalidates cached seasons
+    @property
+    def location(self):
+        return self.base_url
+
+    def url(self, year):
+        return f'{self.base_url}/{PBP_FILE_NAME.format(year=year)}'
+
+    # Size, ETag and modified time of the remote file, read from the response headers of a HEAD request
+    def stat(self, year, timeout=None):
+        request = urllib.request.Request(self.url(year), method='HEAD')
+        with _opener.open(request, timeout=timeout or self.timeout) as response:
+            headers = response.headers
+
+        size = headers.get('Content-Length')
+        last_modified = headers.get('Last-Modified')
+        return {
+            'size': int(size) if size is not None else None,
+            'etag': headers.get('ETag'),
+            'mtime': parsedate_to_datetime(last_modified).timestamp() if last_modified else None,
+        }
+
+    # Seasons from first to last the source has a file for. nflverse publishes every season from 1999 on, so
+    # only the newest seasons are checked (a season's file appears once its first games are played): from
+    # last back to the first season that exists, each check waiting at most `timeout` seconds. Any answer
+    # but a file or a 404 (offline, rate limited, a server error) raises, so the caller can fall back to the
+    # seasons it already has (SeasonCache.seasons) rather than guess which ones exist
+    def seasons(self, first, last, timeout=None):
+        for year in range(last, first - 1, -1):
+            try:
+                self.stat(year, timeout)
+            except urllib.error.HTTPError as error:
+                if error.code == 404:
+                    continue
+                raise
+            return list(range(first, year + 1))
+        return []
+
+    # Remote files have to be downloaded before they can be parsed
+    def local_path(self, year):
+        return None
+
+    # Stream the file to disk in blocks so the download never sits in memory
+    def download(self, year, destination):
+        with _opener.open(self.url(year), timeout=self.timeout) as response, open(destination, 'wb') as out:
+            shutil.copyfileobj(response, out, 1024 * 1024)
+        return destination
+
+
+# Season files that already sit in a local directory (fixture files, a mirror, a network share)
+class LocalSource:
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    @property
+    def location(self):
+        return self.directory
+
+    def path(self, year):
+        return os.path.join(self.directory, PBP_FILE_NAME.format(year=year))
+
+    # Local files have no ETag, so size and modified time are used to spot changes
+    def stat(self, year):
+        file_stat = os.stat(self.path(year))
+        return {'size': file_stat.st_size, 'etag': None, 'mtime': file_stat.st_mtime}
+
+    # Seasons from first to last that have a file in the directory (a directory listing, so nothing to time out)
+    def seasons(self, first, last, timeout=None):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        found = {int(match.group(1)) for match in map(PBP_FILE_PATTERN.fullmatch, names) if match}
+        return sorted(year for year in found if first <= year <= last)
+
+    # Local files are parsed in place, no copy needed
+    def local_path(self, year):
+        return self.path(year)
+
+    def download(self, year, destination):
+        shutil.copyfile(self.path(year), destination)
+        return destination
+
+
+# Pick the right source for a location: http(s):// URL, file:// URL or a plain directory path
+def make_source(location):
+    parsed = urllib.parse.urlparse(location)
+    if parsed.scheme in ('http', 'https'):
+        return HttpSource(location)
+    if parsed.scheme == 'file':
+        return LocalSource(urllib.request.url2pathname(parsed.path))
+    return LocalSource(location)
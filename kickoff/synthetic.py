@@ -0,0 +1,200 @@
+import gzip
+import os
+
+import numpy as np  # Vectorized random draws
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff.ingest import RETAINED_COLUMNS
+from kickoff.sources import PBP_FILE_NAME
+
+# Deterministic, nflverse-shaped play-by-play data so ingest and the dashboard can be exercised
+# (and benchmarked) without downloading anything from GitHub
+
+TEAMS = ['ARI','ATL','BAL','BUF','CAR','CHI','CIN','CLE','DAL','DEN','DET','GB','HOU','IND','JAX','KC',
+         'LA','LAC','LV','MIA','MIN','NE','NO','NYG','NYJ','PHI','PIT','SEA','SF','TB','TEN','WAS']
+
+ROOFS = ['outdoors', 'dome', 'closed', 'open']
+SURFACES = ['grass', 'fieldturf', 'a_turf', 'sportturf']
+DRIVE_RESULTS = ['Touchdown', 'Field goal', 'Punt', 'Turnover', 'Turnover on downs', 'End of half', 'Missed field goal']
+DRIVE_RESULT_WEIGHTS = [0.22, 0.17, 0.38, 0.11, 0.05, 0.04, 0.03]
+PENALTY_TYPES = ['Offensive Holding', 'Illegal Block Above the Waist', 'Unnecessary Roughness', 'Offside on Free Kick',
+                 'Kickoff Out of Bounds', 'Illegal Formation', 'Defensive Holding', 'Face Mask']
+OTHER_PLAY_TYPES = ['pass', 'run', 'punt', 'field_goal', 'extra_point', 'no_play', 'qb_kneel']
+
+# Every nflverse play-by-play file has ~370 columns; pad the synthetic files with filler columns to the same width
+NFLVERSE_COLUMN_COUNT = 372
+
+
+# Players are numbered per team so rosters and play-by-play agree on who the kickers are
+def _player_id(team_index, slot):
+    return f'00-00{team_index:02d}{slot:03d}'
+
+
+# Season rosters in the shape of nfl.import_seasonal_rosters (only the columns the dashboard uses, plus a name)
+def rosters(years):
+    rows = []
+    for year in years:
+        for t, team in enumerate(TEAMS):
+            for slot in range(53):
+                rows.append({'season': year, 'team': team, 'player_id': _player_id(t, slot),
+                             'player_name': f'{team} Player {slot}', 'position': 'K' if slot == 0 else 'WR'})
+    return pd.DataFrame(rows)
+
+
+# Team table in the shape of nfl.import_team_desc
+def teams():
+    return pd.DataFrame({'team_abbr': TEAMS, 'team_name': [f'{team} Team' for team in TEAMS],
+                         'team_nick': TEAMS, 'team_conf': ['AFC' if i % 2 else 'NFC' for i in range(len(TEAMS))]})
+
+
+# Build one season of plays. Besides the kickoffs opening each half, kickoff_rate of the other plays are
+# kickoffs (after scores); the default gives roughly 1 in 14 plays, like the real files
+def season_frame(year, games=272, plays_per_game=170, filler_columns=True, kickoff_rate=0.065):
+    rng = np.random.default_rng(year)
+
+    n = games * plays_per_game
+    game_index = np.repeat(np.arange(games), plays_per_game)
+    play_index = np.tile(np.arange(plays_per_game), games)
+
+    # Pairings and home/away for each game
+    home = rng.integers(0, len(TEAMS), games)
+    away = (home + rng.integers(1, len(TEAMS), games)) % len(TEAMS)
+    week = game_index % 18 + 1
+    game_ids = np.array([f'{year}_{w:02d}_{TEAMS[a]}_{TEAMS[h]}' for w, a, h in zip(week[::plays_per_game], away, home)])
+
+    # Clock: plays spread evenly across 3600 seconds with a few overtime plays at the end
+    game_seconds = np.round(3600 - play_index * (3600 / (plays_per_game - 4))).clip(-600, 3600)
+    game_half = np.where(game_seconds > 1800, 'Half1', np.where(game_seconds >= 0, 'Half2', 'Overtime'))
+    half_seconds = np.where(game_half == 'Half1', game_seconds - 1800, np.where(game_half == 'Half2', game_seconds, game_seconds + 600))
+    game_seconds = game_seconds.clip(0, 3600)
+
+    # Kickoffs open each half and follow scores; drives advance every ~6 plays
+    is_kickoff = (play_index == 0) | (half_seconds == 1800) | (rng.random(n) < kickoff_rate)
+    drive = play_index // 6 + 1
+    play_type = np.where(is_kickoff, 'kickoff', rng.choice(OTHER_PLAY_TYPES, n))
+
+    # Receiving side alternates between the two teams
+    receiving_home = (drive % 2) == 0
+    home_team = np.array(TEAMS)[home[game_index]]
+    away_team = np.array(TEAMS)[away[game_index]]
+    return_team = np.where(receiving_home, home_team, away_team)
+    kicking_team = np.where(receiving_home, away_team, home_team)
+    kicking_index = np.where(receiving_home, away[game_index], home[game_index])
+    receiving_index = np.where(receiving_home, home[game_index], away[game_index])
+
+    # Kick outcome: touchback or return, with a few onside kicks, penalties, injuries and return touchdowns
+    returned = rng.random(n) < np.where(np.asarray(year) >= 2024, 0.6, 0.4)
+    onside = rng.random(n) < 0.01
+    penalty = (rng.random(n) < 0.07).astype(float)
+    injury = rng.random(n) < 0.01
+    touchdown = (returned & (rng.random(n) < 0.006)).astype(float)
+    start_yard = np.where(returned, rng.integers(10, 60, n), 25 if year < 2024 else 30)
+    start_yard_line = np.where(start_yard <= 50, [f'{t} {y}' for t, y in zip(return_team, start_yard)],
+                               [f'{t} {100 - y}' for t, y in zip(kicking_team, start_yard)])
+    start_yard_line = np.where(start_yard == 50, '50', start_yard_line)
+
+    kicker = np.array([_player_id(t, 0) for t in kicking_index])
+    returner = np.where(returned, [_player_id(t, 20) for t in receiving_index], None)
+    tackler = np.where(returned, np.where(rng.random(n) < 0.03, kicker, [_player_id(t, 40) for t in kicking_index]), None)
+
+    desc = np.array([f'{k} kicks 65 yards from {t} 35 to end zone' for k, t in zip(kicker, kicking_team)], dtype=object)
+    desc = np.where(onside, desc + ' onside kick recovered', desc)
+    desc = np.where(injury, desc + ' (player injured)', desc)
+    desc = np.where(returned, desc + '. returned', desc + ', Touchback.')
+
+    roof_by_game = rng.choice(ROOFS, games, p=[0.7, 0.15, 0.1, 0.05])
+    surface_by_game = rng.choice(SURFACES, games)
+    temp_by_game = rng.integers(10, 95, games).astype(float)
+    wind_by_game = rng.integers(0, 25, games).astype(float)
+
+    penalty_flag = penalty == 1
+    penalty_team = np.where(penalty_flag, np.where(rng.random(n) < 0.6, return_team, kicking_team), None)
+
+    df = pd.DataFrame({
+        'season': year,
+        'game_id': game_ids[game_index],
+        'drive': drive.astype(float),
+        'series': (play_index // 3 + 1).astype(float),
+        'series_result': rng.choice(['First down', 'Punt', 'Touchdown', 'Field goal', 'Turnover'], n),
+        'fixed_drive_result': rng.choice(DRIVE_RESULTS, n, p=DRIVE_RESULT_WEIGHTS),
+        'desc': desc,
+        'weather': np.where(roof_by_game[game_index] == 'outdoors', 'Sunny Temp: 60° F', None),
+        'roof': roof_by_game[game_index],
+        'surface': surface_by_game[game_index],
+        'temp': np.where(roof_by_game[game_index] == 'outdoors', temp_by_game[game_index], np.nan),
+        'wind': np.where(roof_by_game[game_index] == 'outdoors', wind_by_game[game_index], np.nan),
+        'kicker_player_id': np.where(is_kickoff, kicker, None),
+        'kickoff_returner_player_id': np.where(is_kickoff, returner, None),
+        'penalty': penalty,
+        'return_team': np.where(is_kickoff, return_team, None),
+        'return_yards': np.where(returned, rng.integers(0, 60, n), 0).astype(float),
+        'penalty_player_id': np.where(penalty_flag, [_player_id(t, 30) for t in kicking_index], None),
+        'penalty_type': np.where(penalty_flag, rng.choice(PENALTY_TYPES, n), None),
+        'penalty_yards': np.where(penalty_flag, rng.choice([5.0, 10.0, 15.0], n), np.nan),
+        'end_yard_line': start_yard_line,
+        'kickoff_inside_twenty': (returned & (start_yard < 20)).astype(float),
+        'kickoff_in_endzone': (~returned).astype(float),
+        'kickoff_out_of_bounds': (rng.random(n) < 0.01).astype(float),
+        'kickoff_downed': 0.0,
+        'kickoff_fair_catch': (rng.random(n) < 0.02).astype(float),
+        'kick_distance': rng.integers(40, 75, n).astype(float),
+        'fumble_lost': (rng.random(n) < 0.005).astype(float),
+        'drive_start_yard_line': start_yard_line,
+        'touchdown': touchdown,
+        'defteam': kicking_team,
+        'play_type': play_type,
+        'play_deleted': (rng.random(n) < 0.003).astype(float),
+        'solo_tackle_1_player_id': tackler,
+        'posteam_type': np.where(receiving_home, 'home', 'away'),
+        'penalty_team': penalty_team,
+        'game_half': game_half,
+        'own_kickoff_recovery': (onside & (rng.random(n) < 0.15)).astype(float),
+        'game_seconds_remaining': game_seconds,
+        'half_seconds_remaining': half_seconds,
+    })[RETAINED_COLUMNS]
+
+    # Filler columns (alternating numeric and text) so parse cost and memory look like a real season file
+    if filler_columns:
+        header, filler = _filler(rng, n)
+        filler = pd.DataFrame([row.split(',') for row in filler], columns=header.split(','))
+        filler[filler.columns[1::2]] = filler[filler.columns[1::2]].astype(float)
+        df = pd.concat([df, filler], axis=1)
+
+    return df
+
+
+# Filler text for the columns a season file has beyond the retained ones: FILLER_ROWS distinct CSV fragments
+# (alternating numeric and text values), one picked per play. Formatting them once instead of per play keeps
+# writing a season fast while the reader still has to tokenize every column
+FILLER_ROWS = 4096
+
+
+def _filler(rng, plays):
+    count = NFLVERSE_COLUMN_COUNT - len(RETAINED_COLUMNS)
+    header = ','.join(f'extra_{i}' for i in range(count))
+    numbers = rng.random((FILLER_ROWS, count)).round(3)
+    texts = rng.choice(['a', 'bb', 'ccc'], (FILLER_ROWS, count))
+    rows = [','.join(str(numbers[r, i]) if i % 2 else texts[r, i] for i in range(count)) for r in range(FILLER_ROWS)]
+    return header, [rows[r] for r in rng.integers(0, FILLER_ROWS, plays)]
+
+
+# Write play_by_play_{year}.csv.gz files for the given seasons into a directory
+def write_seasons(directory, years, games=272, plays_per_game=170, filler_columns=True, kickoff_rate=0.065):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for year in years:
+        df = season_frame(year, games, plays_per_game, filler_columns=False, kickoff_rate=kickoff_rate)
+        lines = df.to_csv(index=False).splitlines()
+
+        # Values never contain line breaks, so each play is one line the filler text can be appended to
+        if filler_columns:
+            header, filler = _filler(np.random.default_rng(year + 10000), len(df))
+            lines = [f'{lines[0]},{header}'] + [f'{line},{extra}' for line, extra in zip(lines[1:], filler)]
+
+        # A fixed gzip timestamp keeps the files byte-for-byte identical from one run to the next
+        path = os.path.join(directory, PBP_FILE_NAME.format(year=year))
+        with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1, mtime=0) as f:
+            f.write('\n'.join(lines).encode())
+            f.write(b'\n')
+        paths.append(path)
+    return paths
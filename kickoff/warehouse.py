@@ -0,0 +1,262 @@
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import duckdb  # Used to write SQL inside Python script
+
+from kickoff.dataset import partition_path, partition_sql, scan_sql, write_partition
+from kickoff.dataset import seasons as dataset_seasons
+from kickoff.facts import KICKOFF_FACTS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Persistent kickoff fact table, so a data refresh only does work for the games that changed. The fact table
+# itself is a season-partitioned Parquet dataset (one file per season, see kickoff/dataset.py) that the SQL
+# engine queries in place. A small DuckDB database next to it keeps track of what the dataset holds:
+#
+#   warehouse_games    one row per (season, game_id): a fingerprint of the game's kickoff plays when it was loaded
+#   warehouse_seasons  one row per season: fingerprint of the reference data (kickers, team names), the
+#                      version of the fact query the season was built with, and whether the season had
+#                      closed when it was last ingested
+#
+# Ingesting a season fingerprints every game in the incoming kickoff plays and compares them with the stored
+# ones. Only new and changed games go through the fact query (every derived column, including the first drive
+# window, only looks at plays of the same game); the season's partition is rewritten with their old rows
+# replaced by the new ones, then the bookkeeping is updated in one transaction. Games no longer in the file are
+# removed. When the season's reference data or the fact query changed, or its partition is missing, the whole
+# season is rebuilt instead.
+#
+# The season file itself still has to be fetched and parsed whole when it changes (nflverse only publishes
+# whole-season files; see kickoff/season_cache.py), but everything after the parse scales with the number of
+# new or changed games.
+#
+# The database is only open while a sync runs, behind a lock file next to it, so any number of processes can
+# share one warehouse: one of them syncs at a time, and the others skip their sync and query the dataset, which
+# never needs the database (partitions are replaced whole, so readers see either the old or the new season)
+
+# Stored with each season; a change to the fact query rebuilds every season on its next ingest
+FACTS_VERSION = hashlib.md5(KICKOFF_FACTS_SQL.encode()).hexdigest()
+
+# Order-independent fingerprint of each game's kickoff plays. Rows are hashed as text so categorical columns
+# hash by value, whatever categories the frame happens to carry
+GAME_FINGERPRINTS_SQL = """
+                         select game_id,
+                                count(*) as plays,
+                                sum(hash(i::varchar)) as fingerprint
+                         from incoming i
+                         group by game_id
+                         """
+
+
+class Warehouse:
+
+    def __init__(self, path, dataset):
+        self.path = path
+        self.dataset = dataset
+        self.lock_path = f'{path}.lock'
+        self.con = None
+        self._lock = threading.Lock()
+
+    # Open the bookkeeping database for writing, for the length of one sync. DuckDB lets a single process open
+    # the file for writing, and several dashboard processes (workers, a precompute job) can share one warehouse,
+    # so the connection is only held behind an inter-process lock on a file next to it. Yields whether this
+    # process got the database: when another process has it and `wait` is false, nothing is opened and the
+    # caller reads the dataset as it stands. One sync at a time per process too: Streamlit sessions run on
+    # separate threads
+    @contextlib.contextmanager
+    def writer(self, wait=False):
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                if not _lock_file(lock_file, wait):
+                    yield False
+                    return
+                try:
+                    self.con = duckdb.connect(self.path)
+                except duckdb.IOException:
+                    # Held by a process that does not take the lock file (e.g. an older version of the dashboard)
+                    logger.warning('Warehouse %s is in use by another process', self.path)
+                    yield False
+                    return
+                try:
+                    self._create_tables()
+                    yield True
+                finally:
+                    self.con.close()
+                    self.con = None
+
+    def _create_tables(self):
+        self.con.execute("""create table if not exists warehouse_games (season smallint, game_id varchar,
+                            fingerprint hugeint, plays integer, loaded_at double, primary key (season, game_id))""")
+        self.con.execute("""create table if not exists warehouse_seasons (season smallint primary key,
+                            reference hugeint, facts_version varchar, closed boolean, loaded_at double)""")
+
+    def _connection(self):
+        if self.con is None:
+            raise RuntimeError(f'Warehouse {self.path} is not open for writing; use it inside warehouse.writer()')
+        return self.con
+
+    # Seasons in the warehouse built with the current fact query and present in the dataset (any other season
+    # is rebuilt by its next ingest); with closed=True only those last ingested after the season had closed.
+    # Needs the database open for writing
+    def seasons(self, closed=False):
+        seasons = self._connection().execute('select season from warehouse_seasons where facts_version = ? and (closed or not ?)',
+                                             [FACTS_VERSION, closed]).fetchall()
+        return sorted(season for season, in seasons if os.path.exists(partition_path(self.dataset, season)))
+
+    # Bring one season up to date with its kickoff plays (as returned by kickoff.ingest.parse_season) and the
+    # kicker and team name lookups. Returns how many games were added, changed, removed and left alone
+    # `closed` records whether the season had closed (see SeasonCache.is_closed). Needs the database open for writing
+    def ingest(self, year, game_logs, kickers, team_names, closed=False):
+        con = self._connection().cursor()
+        try:
+            return self._ingest(con, int(year), game_logs, kickers[kickers['season'] == year], team_names, closed)
+        finally:
+            con.close()
+
+    def _ingest(self, con, year, game_logs, kickers, team_names, closed):
+        started = time.perf_counter()
+
+        # A season without kickoffs yet has categorical columns without categories, which DuckDB cannot read as ENUMs
+        empty = [name for name, dtype in game_logs.dtypes.items() if dtype == 'category' and not len(dtype.categories)]
+        if empty:
+            game_logs = game_logs.astype({name: 'str' for name in empty})
+        con.register('incoming', game_logs)
+        con.register('kickers', kickers)
+        con.register('team_names', team_names)
+
+        # Rebuild the whole season when it was built from other reference data or with another fact query
+        reference = con.execute("""select coalesce((select sum(hash(k::varchar)) from kickers k), 0) +
+                                          coalesce((select sum(hash(t::varchar)) from team_names t), 0)""").fetchone()[0]
+        stored = con.execute('select reference, facts_version from warehouse_seasons where season = ?', [year]).fetchone()
+        rebuild = stored != (reference, FACTS_VERSION) or not os.path.exists(partition_path(self.dataset, year))
+
+        con.execute(f'create or replace temp table incoming_games as {GAME_FINGERPRINTS_SQL}')
+        if rebuild:
+            con.execute('create or replace temp table affected as select game_id from incoming_games')
+        else:
+            con.execute("""create or replace temp table affected as
+                           select n.game_id
+                           from incoming_games n left join
+                                warehouse_games o on o.season = ? and o.game_id = n.game_id
+                           where o.fingerprint is distinct from n.fingerprint or o.plays is distinct from n.plays""", [year])
+
+        counts = {'season': year, 'rebuilt': rebuild}
+        counts['added'], counts['changed'] = con.execute(
+            """select count(*) filter (where o.game_id is null), count(*) filter (where o.game_id is not null)
+               from affected a left join warehouse_games o on o.season = ? and o.game_id = a.game_id""", [year]).fetchone()
+        counts['removed'] = con.execute("""select count(*) from warehouse_games
+                                           where season = ? and game_id not in (select game_id from incoming_games)""",
+                                        [year]).fetchone()[0]
+        counts['unchanged'] = con.execute('select count(*) from incoming_games').fetchone()[0] - counts['added'] - counts['changed']
+
+        if not rebuild and not counts['added'] and not counts['changed'] and not counts['removed']:
+            con.execute('update warehouse_seasons set closed = ? where season = ?', [closed, year])
+            counts['seconds'] = round(time.perf_counter() - started, 3)
+            return counts
+
+        # Derived columns for the affected games only: the fact query reads df_game_log
+        con.execute('create or replace temp view df_game_log as select * from incoming where game_id in (select game_id from affected)')
+        con.execute(f'create or replace temp table new_facts as {KICKOFF_FACTS_SQL}')
+
+        # Categorical columns come out of DuckDB as ENUM types tied to one frame's categories; store them as text
+        columns = ', '.join(f'"{name}"::varchar as "{name}"' if kind.startswith('ENUM') else f'"{name}"'
+                            for name, kind, *_ in con.execute('describe new_facts').fetchall())
+
+        # Rewrite the season's partition first. Should the bookkeeping below fail, the next ingest compares
+        # against the old fingerprints and rewrites the same games again
+        if rebuild:
+            write_partition(con, self.dataset, year, f'select {columns} from new_facts')
+        else:
+            write_partition(con, self.dataset, year, f"""select * from {partition_sql(self.dataset, year)}
+                                                          where game_id not in (select game_id from affected) and
+                                                                game_id in (select game_id from incoming_games)
+                                                          union all by name
+                                                          select {columns} from new_facts""")
+
+        con.execute('begin transaction')
+        try:
+            if rebuild:
+                con.execute('delete from warehouse_games where season = ?', [year])
+            else:
+                con.execute("""delete from warehouse_games
+                               where season = ? and (game_id in (select game_id from affected) or
+                                                     game_id not in (select game_id from incoming_games))""", [year])
+            con.execute("""insert into warehouse_games
+                           select ?, game_id, fingerprint, plays, ?
+                           from incoming_games where game_id in (select game_id from affected)""", [year, time.time()])
+            con.execute('insert or replace into warehouse_seasons values (?, ?, ?, ?, ?)', [year, reference, FACTS_VERSION, closed, time.time()])
+            con.execute('commit')
+        except Exception:
+            con.execute('rollback')
+            raise
+
+        counts['seconds'] = round(time.perf_counter() - started, 3)
+        logger.info('Warehouse season %s: %s added, %s changed, %s removed, %s unchanged%s in %.3f s', year, counts['added'],
+                    counts['changed'], counts['removed'], counts['unchanged'], ' (rebuilt)' if rebuild else '', counts['seconds'])
+        return counts
+
+    # The kickoff fact table of the given seasons loaded into memory, in season order. The dashboard queries
+    # the dataset in place instead; this is for checks and benchmarks. Reads only the dataset, never the database
+    def kickoff_facts(self, years):
+        loaded = set(dataset_seasons(self.dataset))
+        missing = [year for year in years if year not in loaded]
+        if missing:
+            raise KeyError(f'Seasons {missing} are not in the warehouse {self.path}')
+        con = duckdb.connect()
+        try:
+            return con.execute(f"""select season, * exclude (season) from {scan_sql(self.dataset)}
+                                   where season in (select unnest(?)) order by season""", [sorted(years)]).df()
+        finally:
+            con.close()
+
+
+# Bring the warehouse up to date for the given seasons. Seasons ingested after they closed are left alone;
+# missing seasons are loaded (concurrently), and the current season, as well as a season that closed since it
+# was last ingested, is revalidated against the source (the season cache only downloads it again when the file
+# changed) and ingested game by game. Returns the ingest counts.
+# When another process is syncing the warehouse this one skips its sync (returns None) and reads the dataset
+# that process keeps up to date; it only waits for it when the dataset is missing some of the seasons
+def sync(warehouse, season_cache, years, kickers, team_names, fetch_workers=1, parse_workers=1):
+    partitioned = set(dataset_seasons(warehouse.dataset))
+    with warehouse.writer(wait=any(year not in partitioned for year in years)) as writing:
+        if not writing:
+            logger.info('Warehouse %s is being synced by another process, reading the dataset as it is', warehouse.path)
+            return None
+        loaded, settled = set(warehouse.seasons()), set(warehouse.seasons(closed=True))
+        missing = [year for year in years if year not in loaded]
+        game_logs = season_cache.load_many(missing, fetch_workers=fetch_workers, parse_workers=parse_workers)
+        counts = [warehouse.ingest(year, df, kickers, team_names, season_cache.is_closed(year))
+                  for year, df in zip(missing, game_logs)]
+
+        # A season already in the warehouse that cannot be revalidated (source unreachable and not in the season
+        # cache) keeps the games it has, and is revalidated again by the next sync
+        for year in years:
+            if year in loaded and not (year in settled and season_cache.is_closed(year)):
+                try:
+                    df = season_cache.load(year)
+                except OSError:
+                    logger.warning('Could not revalidate season %s, keeping the warehouse copy', year)
+                    continue
+                counts.append(warehouse.ingest(year, df, kickers, team_names, season_cache.is_closed(year)))
+        return counts
+
+
+# Take an exclusive lock on an open file, waiting for it or not. Platforms without fcntl (Windows) have no
+# lock file and rely on DuckDB's own lock on the database file
+def _lock_file(lock_file, wait):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pandas as pd  # Data manipulation and analysis
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import FILTER_GRID  # noqa: E402
+from kickoff import synthetic  # noqa: E402
+from kickoff.facts import build_kickoff_facts  # noqa: E402
+from kickoff.reference import slim_rosters, slim_teams  # noqa: E402
+
+# Small synthetic history shared by the tests: two seasons, so the team summary has to pick the latest one
+YEARS = [2023, 2024]
+GAMES = 40
+
+
+@pytest.fixture(scope='session')
+def filter_states():
+    return FILTER_GRID
+
+
+# Play-by-play kickoffs of each synthetic season, keyed by season
+@pytest.fixture(scope='session')
+def season_frames():
+    return {year: synthetic.season_frame(year, games=GAMES, filler_columns=False) for year in YEARS}
+
+
+@pytest.fixture(scope='session')
+def kickers():
+    return slim_rosters(synthetic.rosters(YEARS))
+
+
+@pytest.fixture(scope='session')
+def team_names():
+    return slim_teams(synthetic.teams())
+
+
+@pytest.fixture(scope='session')
+def kickoff_facts(season_frames, kickers, team_names):
+    return build_kickoff_facts(pd.concat(season_frames.values(), ignore_index=True), kickers, team_names)
@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.common import assert_same_summaries, baseline_summaries
+from kickoff.cube import KickoffCube
+from kickoff.queries import KickoffQueries, filter_params
+
+
+@pytest.fixture(scope='module')
+def kickoff_queries(kickoff_facts):
+    return KickoffQueries(kickoff_facts)
+
+
+@pytest.fixture(scope='module')
+def kickoff_cube(kickoff_facts):
+    return KickoffCube.from_facts(kickoff_facts)
+
+
+# Adding up cells must give what the row-level queries give, for every measure of every summary
+def test_cube_matches_row_level_queries(kickoff_cube, kickoff_queries, filter_states):
+    for state in filter_states:
+        filters = filter_params(*state)
+        summaries = kickoff_cube.summaries(filters)
+        assert_same_summaries(baseline_summaries(lambda sql: kickoff_queries.run(sql, filters)), summaries)
+        assert_same_summaries(kickoff_queries.summaries(filters), summaries)
+
+
+def test_cube_season_range(kickoff_cube, kickoff_queries):
+    for seasons in [(2023, 2023), (2024, 2024), (2025, 2030)]:
+        filters = filter_params((0, 60), (0, 30), 'Select All', 'Select All', seasons=seasons)
+        assert_same_summaries(kickoff_queries.summaries(filters), kickoff_cube.summaries(filters))
@@ -0,0 +1,25 @@
+import pandas as pd  # Data manipulation and analysis
+
+from kickoff.ingest import parse_season
+from kickoff.schema import KICKOFF_SCHEMA
+from kickoff.sources import LocalSource
+from kickoff.synthetic import write_seasons
+
+YEAR = 2024
+
+
+# A season file laid out like nflverse's: every play type, with the filler columns the dashboard never reads.
+# Only the kickoffs are kept, with exactly the columns and types of the compact schema
+def test_parse_season_keeps_kickoffs_in_the_schema(tmp_path):
+    write_seasons(str(tmp_path), [YEAR], games=4, filler_columns=True)
+    path = LocalSource(str(tmp_path)).path(YEAR)
+    plays = pd.read_csv(path, usecols=['play_type', 'game_id'])
+    assert (plays['play_type'] != 'kickoff').any()
+
+    df = parse_season(path)
+    assert list(df.columns) == list(KICKOFF_SCHEMA)
+    for column, dtype in KICKOFF_SCHEMA.items():
+        assert df[column].dtype == dtype, (column, df[column].dtype, dtype)
+    assert len(df) == (plays['play_type'] == 'kickoff').sum()
+    assert (df['play_type'] == 'kickoff').all()
+    assert set(df['game_id']) == set(plays['game_id'])
@@ -0,0 +1,45 @@
+import pytest
+
+from benchmarks.common import assert_same_summaries, baseline_summaries
+from kickoff.aggregates import INTERVAL_MEASURES, SUMMARY_KEYS
+from kickoff.dataset import write_dataset
+from kickoff.queries import KickoffQueries, filter_params
+
+
+# The query layer over the fact table copied into DuckDB, and over the same facts as a Parquet dataset
+@pytest.fixture(scope='module', params=['table', 'dataset'])
+def kickoff_queries(request, kickoff_facts, tmp_path_factory):
+    if request.param == 'table':
+        return KickoffQueries(kickoff_facts)
+    directory = str(tmp_path_factory.mktemp('kickoff_facts'))
+    write_dataset(kickoff_facts, directory)
+    return KickoffQueries(directory)
+
+
+def test_summaries_match_baseline_queries(kickoff_queries, filter_states):
+    for state in filter_states:
+        filters = filter_params(*state)
+        expected = baseline_summaries(lambda sql: kickoff_queries.run(sql, filters))
+        assert_same_summaries(expected, kickoff_queries.summaries(filters))
+
+
+def test_season_range_matches_baseline_queries(kickoff_queries):
+    filters = filter_params((0, 60), (0, 30), 'Select All', 'Select All', seasons=(2023, 2023))
+    expected = baseline_summaries(lambda sql: kickoff_queries.run(sql, filters))
+    assert list(expected['season']['season']) == [2023]
+    assert_same_summaries(expected, kickoff_queries.summaries(filters))
+
+
+# Intervals of both grains come from one scan of per-game totals; they must cover the same groups as the
+# summaries, and each interval must contain the summary's point estimate
+def test_intervals_match_summaries(kickoff_queries):
+    filters = filter_params((0, 60), (0, 30), 'Select All', 'Select All')
+    summaries = kickoff_queries.summaries(filters)
+    intervals = kickoff_queries.intervals(filters, replicates=200)
+    for grain, keys in SUMMARY_KEYS.items():
+        joined = summaries[grain].merge(intervals[grain], on=keys, how='outer', indicator=True)
+        assert (joined['_merge'] == 'both').all()
+        for measure in INTERVAL_MEASURES:
+            valid = joined[f'{measure}_low'].notna()
+            assert (joined.loc[valid, f'{measure}_low'] <= joined.loc[valid, measure] + 1e-9).all()
+            assert (joined.loc[valid, measure] <= joined.loc[valid, f'{measure}_high'] + 1e-9).all()
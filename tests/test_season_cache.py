@@ -0,0 +1,106 @@
+import os
+import time
+
+import pytest
+
+from kickoff.season_cache import SeasonCache
+from kickoff.sources import LocalSource
+from kickoff.synthetic import write_seasons
+
+CLOSED, CURRENT = 2023, 2024
+
+
+# Local source counting how often the cache asks it about a season (stat) and fetches one (local_path, which
+# the cache only calls to parse a season it is refreshing). With `offline` set every stat fails, like an
+# unreachable or rate limited server
+class CountingSource(LocalSource):
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.stats = 0
+        self.fetches = 0
+        self.offline = False
+
+    def stat(self, year):
+        self.stats += 1
+        if self.offline:
+            raise OSError('source unreachable')
+        return super().stat(year)
+
+    def local_path(self, year):
+        self.fetches += 1
+        return super().local_path(year)
+
+
+@pytest.fixture
+def source(tmp_path):
+    write_seasons(str(tmp_path / 'data'), [CLOSED, CURRENT], games=4, filler_columns=False)
+    return CountingSource(str(tmp_path / 'data'))
+
+
+def cache(tmp_path, source, current_season=CURRENT):
+    return SeasonCache(str(tmp_path / 'cache'), source, current_season=current_season)
+
+
+# Move a season file's modified time forward, as if a new version had been published
+def touch(source, year, seconds=60):
+    when = time.time() + seconds
+    os.utime(source.path(year), (when, when))
+
+
+def test_closed_season_is_never_fetched_again(tmp_path, source):
+    first = cache(tmp_path, source).load(CLOSED)
+    assert (source.stats, source.fetches) == (1, 1)
+
+    # Cached after it closed: read from the cache without asking the source, even in a new process
+    touch(source, CLOSED)
+    for _ in range(3):
+        assert len(cache(tmp_path, source).load(CLOSED)) == len(first)
+    assert (source.stats, source.fetches) == (1, 1)
+
+
+def test_current_season_is_fetched_only_when_the_file_changed(tmp_path, source):
+    season_cache = cache(tmp_path, source)
+    season_cache.load(CURRENT)
+    season_cache.load(CURRENT)
+    assert (source.stats, source.fetches) == (2, 1)
+
+    touch(source, CURRENT)
+    season_cache.load(CURRENT)
+    season_cache.load(CURRENT)
+    assert (source.stats, source.fetches) == (4, 2)
+
+
+def test_stale_copy_is_served_when_the_source_fails(tmp_path, source):
+    season_cache = cache(tmp_path, source)
+    cached = season_cache.load(CURRENT)
+
+    source.offline = True
+    assert len(season_cache.load(CURRENT)) == len(cached)
+    assert source.fetches == 1
+
+    # Nothing cached to fall back on
+    with pytest.raises(OSError):
+        season_cache.load(CLOSED)
+
+
+# A season cached while it was being played is revalidated once after it closes, then never again
+def test_season_is_revalidated_once_after_it_closes(tmp_path, source):
+    cache(tmp_path, source).load(CURRENT)
+    assert (source.stats, source.fetches) == (1, 1)
+
+    # The final week was published after the last refresh of the season
+    touch(source, CURRENT)
+    after_rollover = cache(tmp_path, source, current_season=CURRENT + 1)
+    after_rollover.load(CURRENT)
+    assert (source.stats, source.fetches) == (2, 2)
+    after_rollover.load(CURRENT)
+    assert (source.stats, source.fetches) == (2, 2)
+
+
+def test_unchanged_season_is_marked_closed_without_fetching(tmp_path, source):
+    cache(tmp_path, source).load(CURRENT)
+    after_rollover = cache(tmp_path, source, current_season=CURRENT + 1)
+    after_rollover.load(CURRENT)
+    after_rollover.load(CURRENT)
+    assert (source.stats, source.fetches) == (2, 1)
@@ -0,0 +1,59 @@
+import http.server
+import threading
+
+import pytest
+
+from conftest import YEARS
+from kickoff.season_cache import SeasonCache
+from kickoff.sources import HttpSource, LocalSource
+from kickoff.synthetic import write_seasons
+
+
+# Local HTTP server standing in for the nflverse releases: serves the season files of a directory, or answers
+# every request with `status` when it is set (a rate limit, a server error)
+@pytest.fixture
+def server(tmp_path):
+    directory = str(tmp_path / 'releases')
+    write_seasons(directory, YEARS, games=4, filler_columns=False)
+    state = {'status': None}
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def send_head(self):
+            if state['status']:
+                self.send_error(state['status'])
+                return None
+            return super().send_head()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield HttpSource(f'http://127.0.0.1:{httpd.server_address[1]}'), state, directory
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_seasons_skip_unpublished(server):
+    source, _, _ = server
+    assert source.seasons(2020, max(YEARS) + 2, timeout=5) == list(range(2020, max(YEARS) + 1))
+
+
+# Failures other than a missing file raise instead of guessing which seasons exist; the seasons cached from the
+# source are what can still be served
+@pytest.mark.parametrize('status', [403, 429, 503])
+def test_seasons_fall_back_to_cache(server, tmp_path, status):
+    source, state, directory = server
+    cache = SeasonCache(str(tmp_path / 'cache'), source, current_season=max(YEARS))
+    cache.load(min(YEARS))
+
+    state['status'] = status
+    with pytest.raises(OSError):
+        source.seasons(2020, max(YEARS) + 1, timeout=5)
+    assert cache.seasons(2020, max(YEARS) + 1) == [min(YEARS)]
+
+    # Cached from another source: nothing to serve
+    assert SeasonCache(str(tmp_path / 'cache'), LocalSource(directory), current_season=max(YEARS)).seasons(2020, 2030) == []
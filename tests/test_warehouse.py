@@ -0,0 +1,113 @@
+import gzip
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd  # Data manipulation and analysis
+import pytest
+
+from benchmarks.common import assert_same_facts
+from conftest import YEARS
+from kickoff.facts import build_kickoff_facts
+from kickoff.schema import concat_seasons
+from kickoff.season_cache import SeasonCache
+from kickoff.sources import LocalSource
+from kickoff.warehouse import Warehouse, sync
+
+CURRENT = max(YEARS)
+
+
+# Publish a season's play-by-play file. The season cache compares files by size and modified time, so the
+# modified time is moved forward to make every publication look changed
+def publish(source, season, step):
+    path = source.path(int(season['season'].iloc[0]))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', compresslevel=1) as f:
+        season.to_csv(f, index=False)
+    os.utime(path, (time.time() + step, time.time() + step))
+
+
+@pytest.fixture
+def warehouse_run(tmp_path, season_frames):
+    source = LocalSource(str(tmp_path / 'data'))
+    for year in YEARS:
+        publish(source, season_frames[year], 0)
+    season_cache = SeasonCache(str(tmp_path / 'cache'), source, current_season=CURRENT)
+    warehouse = Warehouse(str(tmp_path / 'kickoffs.duckdb'), str(tmp_path / 'kickoff_facts'))
+    return source, season_cache, warehouse
+
+
+# The warehouse, refreshed game by game, holds the fact table a full rebuild from the same files would build
+def test_incremental_sync_matches_full_build(warehouse_run, season_frames, kickers, team_names):
+    source, season_cache, warehouse = warehouse_run
+    season = season_frames[CURRENT]
+    games = list(season['game_id'].unique())
+
+    def check(kickers, **expected_counts):
+        counts = sync(warehouse, season_cache, YEARS, kickers, team_names)
+        current = [count for count in counts if count['season'] == CURRENT][0]
+        for key, value in expected_counts.items():
+            assert current[key] == value, (key, current)
+        expected = build_kickoff_facts(concat_seasons(season_cache.load_many(YEARS)), kickers, team_names)
+        assert_same_facts(expected, warehouse.kickoff_facts(YEARS))
+        return expected
+
+    # The current season part way through, then with the rest of its games added
+    publish(source, season[season['game_id'].isin(games[:25])], 1)
+    check(kickers, added=25, rebuilt=True)
+    publish(source, season, 2)
+    check(kickers, added=len(games) - 25, changed=0, removed=0, rebuilt=False)
+
+    # A play corrected after the fact
+    corrected = season.copy()
+    row = corrected.index[(corrected['game_id'] == games[3]) & (corrected['play_type'] == 'kickoff')][0]
+    corrected.loc[row, 'kick_distance'] += 5
+    publish(source, corrected, 3)
+    check(kickers, added=0, changed=1, removed=0, rebuilt=False)
+
+    # A game taken out of the file
+    removed = corrected[corrected['game_id'] != games[5]]
+    publish(source, removed, 4)
+    check(kickers, added=0, changed=0, removed=1, rebuilt=False)
+
+    # The player who made a kickoff tackle listed as a kicker: the season is rebuilt with the new lookup
+    tackler = removed.loc[(removed['play_type'] == 'kickoff') & removed['solo_tackle_1_player_id'].notna(), 'solo_tackle_1_player_id'].iloc[0]
+    before = build_kickoff_facts(concat_seasons(season_cache.load_many(YEARS)), kickers, team_names)
+    listed = pd.concat([kickers, pd.DataFrame({'season': [CURRENT], 'player_id': [tackler]}).astype(kickers.dtypes)], ignore_index=True)
+    after = check(listed, rebuilt=True)
+    assert after['solo_tackle_by_kicker'].sum() > before['solo_tackle_by_kicker'].sum()
+
+
+# Two processes sharing a warehouse: the database is only open during a sync, and a process finding the lock
+# taken skips its sync and reads the dataset
+def test_sync_holds_the_database_only_while_syncing(warehouse_run, kickers, team_names):
+    _, season_cache, warehouse = warehouse_run
+    assert sync(warehouse, season_cache, YEARS, kickers, team_names)
+
+    # Another process can open the database for writing once the sync is over
+    subprocess.run([sys.executable, '-c', f'import duckdb; duckdb.connect({warehouse.path!r}).close()'], check=True)
+
+    other = Warehouse(warehouse.path, warehouse.dataset)
+    with warehouse.writer() as writing:
+        assert writing
+        assert sync(other, season_cache, YEARS, kickers, team_names) is None
+        assert len(other.kickoff_facts(YEARS)) > 0
+
+
+# A season ingested while it was being played is revalidated once after it closes: games published after the
+# last refresh of the season are added, then the season is left alone
+def test_season_is_revalidated_once_after_it_closes(warehouse_run, season_frames, kickers, team_names):
+    source, season_cache, warehouse = warehouse_run
+    season = season_frames[CURRENT]
+    games = list(season['game_id'].unique())
+    publish(source, season[season['game_id'].isin(games[:-4])], 1)
+    sync(warehouse, season_cache, YEARS, kickers, team_names)
+
+    publish(source, season, 2)
+    after_rollover = SeasonCache(season_cache.directory, source, current_season=CURRENT + 1)
+    counts = sync(warehouse, after_rollover, YEARS, kickers, team_names)
+    assert [(count['season'], count['added']) for count in counts] == [(CURRENT, 4)]
+    assert sync(warehouse, after_rollover, YEARS, kickers, team_names) == []
+    assert_same_facts(build_kickoff_facts(concat_seasons(after_rollover.load_many(YEARS)), kickers, team_names),
+                      warehouse.kickoff_facts(YEARS))